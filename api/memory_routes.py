@@ -1,38 +1,77 @@
 #!/usr/bin/env python3
 
-from flask import request, jsonify
+from flask import request, jsonify, Response
 from config import config
 from services.memory_search_service import memory_search_service
 
 def register_memory_routes(app):
     """Register all memory-related routes with the Flask app"""
-    
     @app.route('/check_memory_availability')
     def check_memory_availability():
         """Check if the memory system is available"""
         return jsonify({'available': config.memory_available})
     
+    @app.route('/health')
+    def health():
+        """Readiness check: 503 until the memory system's model is warmed up"""
+        manager = config.memory_manager
+        if config.memory_available and hasattr(manager, 'get_readiness'):
+            readiness = manager.get_readiness()
+        else:
+            # Lightweight manager (or no memory system): nothing to warm up
+            readiness = {'ready': True, 'status': 'ready' if config.memory_available else 'unavailable'}
+        readiness['memory_available'] = config.memory_available
+        return jsonify(readiness), 200 if readiness['ready'] else 503
+    
     @app.route('/new-memories')
     def get_new_memories():
-        """Get and clear the queue of new memories for real-time network updates"""
-        print(f"🔧 DEBUG: /new-memories endpoint called")
-        
-        with config.session_new_memories_lock:
-            print(f"🔧 DEBUG: Session queue size before copy: {len(config.session_new_memories)}")
-            new_memories = config.session_new_memories.copy()
-            config.session_new_memories.clear()
-            print(f"🔧 DEBUG: Session queue size after clear: {len(config.session_new_memories)}")
-        
-        print(f"🔧 DEBUG: Returning {len(new_memories)} new memories")
-        if new_memories:
-            for i, memory in enumerate(new_memories):
-                print(f"🔧 DEBUG: Memory {i+1}: {memory.get('content', 'N/A')[:30]}...")
+        """Memories extracted from conversations since ?since=<cursor>"""
+        new_memories, cursor, missed = config.new_memory_events.poll(request.args.get('since'))
         
         return jsonify({
             'memories': new_memories,
-            'count': len(new_memories)
+            'count': len(new_memories),
+            'cursor': cursor,
+            'missed': missed
         })
     
+    @app.route('/memory-events')
+    def memory_events():
+        """Live feed of memories extracted from conversations, for the network page"""
+        events = config.new_memory_events
+        cursor = events.parse_cursor(request.headers.get('Last-Event-ID', request.args.get('since')))
+        return Response(events.stream(cursor), mimetype='text/event-stream',
+                        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+    
+    @app.route('/score-updates')
+    def get_score_updates():
+        """Scores for live updates: only memories changed since ?since=<generation>&epoch=<epoch>, or all of them"""
+        if not config.memory_available:
+            return jsonify({'success': False, 'error': 'Memory system not available'}), 503
+        try:
+            manager = config.memory_manager
+            if hasattr(manager, 'get_score_updates'):
+                memories, generation, epoch, full = manager.get_score_updates(request.args.get('since', type=int),
+                                                                              request.args.get('epoch'))
+            else:
+                memories, generation, epoch, full = manager._get_all_memories_flat(), None, None, True
+            
+            score_updates = [{
+                'id': mem['id'],
+                'score': mem.get('score', 0),
+                'content': mem['content'][:50] + '...' if len(mem['content']) > 50 else mem['content']
+            } for mem in memories]
+            
+            return jsonify({
+                'success': True,
+                'updates': score_updates,
+                'generation': generation,
+                'epoch': epoch,
+                'full': full
+            })
+        except Exception as e:
+            return jsonify({'success': False, 'error': str(e)}), 500
+    
     @app.route('/memory-network')
     def memory_network():
         """Get memory network data for visualization"""
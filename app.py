@@ -40,7 +40,7 @@ register_memory_routes(app)
 
 # Setup file watcher for memory changes
 if config.memory_available and config.memory_manager:
-    setup_file_watcher(config.memory_manager, config.memory_json_path)
+    setup_file_watcher(config.memory_manager)
 
 if __name__ == '__main__':
     print("🤖 Starting ChatGPT Clone with OpenAI API and Memory Search...")
@@ -2149,40 +2149,40 @@ def memory_network():
         # Get threshold from query param, default 0.35
         threshold = float(request.args.get('threshold', 0.35))
         
-        # Use the comprehensive function to get connections and similarity matrix
-        result = memory_manager._calculate_all_scores_and_connections(threshold)
-        if result is None or result == (None, None):
-            return jsonify({'nodes': [], 'edges': []})
+        # Graph and node list under the manager lock, so a concurrent add/delete cannot
+        # shift rows between reading the graph and reading the memories
+        with memory_manager._lock:
+            # Use the comprehensive function to get the sparse connection graph
+            graph, _ = memory_manager._calculate_scores_and_graph(threshold)
+            if graph is None:
+                return jsonify({'nodes': [], 'edges': []})
         
-        connections, sim_matrix = result
-        all_mems = memory_manager._get_all_memories_flat()
-        nodes = []
-        edges = []
-
-        # Build nodes
-        for mem in all_mems:
-            nodes.append({
-                'id': mem['id'],
-                'label': mem['content'],
-                'score': mem.get('score', 0),
-                'created': mem.get('created', ''),
-                'tags': mem.get('tags', []),
-                'size': 20 + min(mem.get('score', 0), 100) * 0.5,
-            })
-
-        # Build edges from the connection graph
-        n = len(all_mems)
-        for i in range(n):
-            for j, sim in connections[i]:
-                if i < j:  # Avoid duplicate edges
-                    edges.append({
-                        'from': all_mems[i]['id'],
-                        'to': all_mems[j]['id'],
-                        'value': sim,
-                        'color': 'rgba(168,85,247,' + str(min(1, sim)) + ')',
-                        'width': 2 + 12 * sim,
-                        'type': 'semantic'
-                    })
+            all_mems = memory_manager.search_index_map
+            nodes = []
+            edges = []
+
+            # Build nodes
+            for mem in all_mems:
+                nodes.append({
+                    'id': mem['id'],
+                    'label': mem['content'],
+                    'score': mem.get('score', 0),
+                    'created': mem.get('created', ''),
+                    'tags': mem.get('tags', []),
+                    'size': 20 + min(mem.get('score', 0), 100) * 0.5,
+                })
+
+            # Build edges from the sparse connection graph (each undirected edge once)
+            rows, cols, sims = graph.upper_edges()
+            for i, j, sim in zip(rows.tolist(), cols.tolist(), sims.tolist()):
+                edges.append({
+                    'from': all_mems[i]['id'],
+                    'to': all_mems[j]['id'],
+                    'value': sim,
+                    'color': 'rgba(168,85,247,' + str(min(1, sim)) + ')',
+                    'width': 2 + 12 * sim,
+                    'type': 'semantic'
+                })
 
         return jsonify({'nodes': nodes, 'edges': edges})
         
@@ -2581,8 +2581,8 @@ def start_memory_file_watcher(memory_manager, path):
             self.last_file_hash = None
             
         def on_modified(self, event):
-            # Only process memories.json files
-            if not event.src_path.endswith('memories.json'):
+            # Only process memories.json and its write-ahead log
+            if not event.src_path.endswith(('memories.json', 'memories.json.wal')):
                 return
                 
             # Skip temporary, backup, and lock files
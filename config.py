@@ -1,6 +1,7 @@
 #!/usr/bin/env python3
 
 import os
+import sys
 import threading
 from dotenv import load_dotenv
 from openai import OpenAI
@@ -8,6 +9,10 @@ from openai import OpenAI
 # Load environment variables
 load_dotenv()
 
+# Modules shared with the standalone memory backend
+sys.path.append(os.path.join(os.path.dirname(__file__), 'memory-app', 'backend'))
+from memory_events import MemoryEventLog
+
 class Config:
     """Configuration class for the Moneta application"""
     
@@ -26,6 +31,13 @@ class Config:
         self.memory_available = False
         self.memory_manager = None
         self.memory_json_path = 'memory_data.json'
+        # Storage backend for the full memory manager: 'json' (memories.json) or 'sqlite' (memories.db)
+        self.memory_storage_backend = os.getenv('MEMORY_STORAGE_BACKEND', 'json')
+        # Load and warm up the embedding model in the background at startup; /health
+        # reports 503 until it is done. 'false' loads the model on first use instead.
+        self.memory_warmup = os.getenv('MEMORY_WARMUP', 'true').lower() == 'true'
+        # New memories for the network UI; each /memory-events client reads it with its own cursor
+        self.new_memory_events = MemoryEventLog()
         
         # Memory search configuration (optimized for full ML version)
         self.min_relevance_threshold = 0.7  # Higher threshold for better quality with ML
@@ -44,12 +56,16 @@ class Config:
             sys.path.append(os.path.join(os.path.dirname(__file__), 'memory-app', 'backend'))
             from memory_manager import MemoryManager
             
-            self.memory_manager = MemoryManager()
+            self.memory_manager = MemoryManager(storage_backend=self.memory_storage_backend)
             self.memory_available = True
+            if self.memory_warmup:
+                self.memory_manager.start_warmup()
             print("🚀 Full ML-powered memory system initialized successfully!")
             print("   - Semantic search with sentence-transformers")
             print("   - Advanced similarity calculations with scikit-learn")
             print("   - High-performance memory retrieval")
+            if self.memory_warmup:
+                print("   - Model warming up in the background (see /health)")
         except ImportError as e:
             print(f"⚠️  Full memory system not available: {e}")
             print("   Falling back to lightweight version...")
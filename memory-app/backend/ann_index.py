@@ -0,0 +1,164 @@
+import os
+import numpy as np
+
+
+class ExactIndex:
+    """Brute-force inner-product search over every live row of a SearchIndex."""
+
+    name = 'exact'
+    approximate = False
+
+    def reset(self):
+        pass
+
+    def remap(self, old_to_new):
+        pass
+
+    def search(self, search_index, query, k=None):
+        """
+        Return (rows, similarities) of live rows. With k=None every live row is
+        returned in row order; otherwise the k most similar rows.
+        """
+        if len(search_index) == 0:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32)
+        similarities = search_index.dot(query)
+        rows = np.flatnonzero(search_index.alive)
+        similarities = similarities[rows]
+        if k is not None and k < len(rows):
+            top = np.argpartition(-similarities, k - 1)[:k]
+            rows, similarities = rows[top], similarities[top]
+        return rows, similarities
+
+    def get_stats(self):
+        return {'backend': self.name}
+
+
+class IVFFlatIndex:
+    """
+    Inverted-file index with flat (uncompressed) storage, implemented in NumPy.
+
+    Rows are clustered with spherical k-means into `nlist` lists; a query only
+    scans the rows of its `nprobe` closest lists. New rows are assigned to
+    their nearest centroid on the next search, tombstoned rows are skipped,
+    and the centroids are retrained once the index has doubled in size.
+    Below `min_train_size` rows it answers exactly.
+
+    Recall/latency knobs:
+        nlist: Number of lists (default ~sqrt(n)); more lists = fewer rows per probe
+        nprobe: Lists scanned per query; higher = better recall, slower
+    """
+
+    name = 'ivf'
+    approximate = True
+
+    def __init__(self, nlist=None, nprobe=8, min_train_size=2048, kmeans_iterations=10,
+                 max_training_rows=50000, seed=0):
+        self.nlist = nlist
+        self.nprobe = nprobe
+        self.min_train_size = min_train_size
+        self.kmeans_iterations = kmeans_iterations
+        self.max_training_rows = max_training_rows
+        self.seed = seed
+        self._exact = ExactIndex()
+        self.reset()
+
+    def reset(self):
+        self.centroids = None
+        self._lists = []
+        self._assigned = 0       # rows [0, _assigned) have been placed in a list
+        self._trained_size = 0
+
+    def remap(self, old_to_new):
+        """Renumber rows after the search index was compacted."""
+        if self.centroids is None:
+            return
+        lists = []
+        for rows in self._lists:
+            new_rows = old_to_new[np.asarray(rows, dtype=np.int64)] if rows else np.zeros(0, dtype=np.int64)
+            lists.append(new_rows[new_rows >= 0].tolist())
+        self._lists = lists
+        self._assigned = int((old_to_new[:self._assigned] >= 0).sum())
+
+    def _train(self, search_index):
+        live_rows = np.flatnonzero(search_index.alive)
+        n = len(live_rows)
+        nlist = self.nlist or max(1, int(np.sqrt(n)))
+        nlist = min(nlist, n)
+        rng = np.random.default_rng(self.seed)
+        if n > self.max_training_rows:
+            live_rows = np.sort(rng.choice(live_rows, self.max_training_rows, replace=False))
+        sample = search_index.vectors(live_rows)
+        centroids = sample[rng.choice(len(sample), nlist, replace=False)].copy()
+        for _ in range(self.kmeans_iterations):
+            assignments = np.argmax(sample @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assignments, sample)
+            norms = np.linalg.norm(sums, axis=1, keepdims=True)
+            empty = norms[:, 0] == 0
+            sums[empty] = centroids[empty]  # Keep the old centroid for empty clusters
+            norms[empty] = np.linalg.norm(centroids[empty], axis=1, keepdims=True)
+            centroids = sums / np.maximum(norms, 1e-12)
+        self.centroids = centroids.astype(np.float32)
+        self._lists = [[] for _ in range(nlist)]
+        self._assigned = 0
+        self._trained_size = n
+
+    def _assign_new_rows(self, search_index):
+        if self._assigned >= search_index.size:
+            return
+        for start in range(self._assigned, search_index.size, search_index.DOT_BLOCK_SIZE):
+            new_rows = np.arange(start, min(start + search_index.DOT_BLOCK_SIZE, search_index.size))
+            assignments = np.argmax(search_index.vectors(new_rows) @ self.centroids.T, axis=1)
+            for row, list_id in zip(new_rows.tolist(), assignments.tolist()):
+                self._lists[list_id].append(row)
+        self._assigned = search_index.size
+
+    def search(self, search_index, query, k=None):
+        live = len(search_index)
+        if live < self.min_train_size:
+            return self._exact.search(search_index, query, k)
+        if self.centroids is None or live > 2 * self._trained_size:
+            self._train(search_index)
+        self._assign_new_rows(search_index)
+
+        nprobe = min(self.nprobe, len(self.centroids))
+        if nprobe >= len(self.centroids):
+            return self._exact.search(search_index, query, k)
+        probe = np.argpartition(-(self.centroids @ query), nprobe - 1)[:nprobe]
+        rows = np.concatenate([np.asarray(self._lists[c], dtype=np.int64) for c in probe])
+        rows = rows[search_index.alive[rows]]
+        similarities = search_index.dot(query, rows)
+        if k is not None and k < len(rows):
+            top = np.argpartition(-similarities, k - 1)[:k]
+            rows, similarities = rows[top], similarities[top]
+        return rows, similarities
+
+    def get_stats(self):
+        return {
+            'backend': self.name,
+            'trained': self.centroids is not None,
+            'nlist': 0 if self.centroids is None else len(self.centroids),
+            'nprobe': self.nprobe,
+        }
+
+
+ANN_BACKENDS = {
+    'exact': ExactIndex,
+    'ivf': IVFFlatIndex,
+}
+
+
+def create_ann_index(backend=None, **options):
+    """
+    Create the ANN backend named by `backend` or the MEMORY_ANN_BACKEND env var
+    ('exact' by default). MEMORY_ANN_NPROBE and MEMORY_ANN_NLIST tune 'ivf'.
+    """
+    backend = backend or os.getenv('MEMORY_ANN_BACKEND', 'exact')
+    if backend not in ANN_BACKENDS:
+        raise ValueError(f"Unknown ANN backend '{backend}', expected one of {list(ANN_BACKENDS)}")
+    if backend == 'ivf':
+        if 'nprobe' not in options and os.getenv('MEMORY_ANN_NPROBE'):
+            options['nprobe'] = int(os.getenv('MEMORY_ANN_NPROBE'))
+        if 'nlist' not in options and os.getenv('MEMORY_ANN_NLIST'):
+            options['nlist'] = int(os.getenv('MEMORY_ANN_NLIST'))
+    return ANN_BACKENDS[backend](**options)
@@ -1,5 +1,6 @@
-from flask import Flask, request, jsonify, send_from_directory
+from flask import Flask, request, jsonify, send_from_directory, Response
 from memory_manager import MemoryManager
+from memory_events import MemoryEventLog
 from flask_cors import CORS
 import os
 import threading
@@ -7,10 +8,17 @@ import threading
 app = Flask(__name__, static_folder='../frontend')
 CORS(app)  # This will enable CORS for all routes
 mm = MemoryManager()
+if os.getenv('MEMORY_WARMUP', 'true').lower() == 'true':
+    mm.start_warmup()
 
-# Session memory queue for real-time updates
-session_new_memories = []
-session_new_memories_lock = threading.Lock()
+# New memories for real-time network updates
+new_memory_events = MemoryEventLog()
+
+@app.route('/health')
+def health():
+    # 503 until the embedding model is loaded and warmed up
+    readiness = mm.get_readiness()
+    return jsonify(readiness), 200 if readiness['ready'] else 503
 
 @app.route('/')
 def serve_index():
@@ -43,9 +51,8 @@ def handle_memories():
                 'tags': new_mem.get('tags', []),
                 'created': new_mem.get('created', '')
             }
-            with session_new_memories_lock:
-                session_new_memories.append(memory_data)
-            print(f"🌐 Queued new memory for network: {memory_data['id']}")
+            new_memory_events.publish(memory_data)
+            print(f"🌐 Published new memory for network: {memory_data['id']}")
         
         return jsonify(new_mem), 201
     else: # GET
@@ -76,16 +83,23 @@ def set_model():
 
 @app.route('/new-memories')
 def get_new_memories():
-    """Get and clear the queue of new memories for real-time network updates"""
-    with session_new_memories_lock:
-        new_memories = session_new_memories.copy()
-        session_new_memories.clear()
+    """Memories added since ?since=<cursor> (see MemoryEventLog.poll)"""
+    new_memories, cursor, missed = new_memory_events.poll(request.args.get('since'))
     
     return jsonify({
         'memories': new_memories,
-        'count': len(new_memories)
+        'count': len(new_memories),
+        'cursor': cursor,
+        'missed': missed
     })
 
+@app.route('/memory-events')
+def memory_events():
+    """Server-Sent Events stream of new memories"""
+    cursor = new_memory_events.parse_cursor(request.headers.get('Last-Event-ID', request.args.get('since')))
+    return Response(new_memory_events.stream(cursor), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
 @app.route('/memory-network')
 def memory_network():
     # Get threshold from query param, default 0.35
@@ -94,53 +108,54 @@ def memory_network():
     except Exception:
         threshold = 0.35
     
-    # Use the comprehensive function to get connections and similarity matrix (preserve reinforcement)
-    result = mm._calculate_all_scores_and_connections(threshold, preserve_reinforcement=True)
-    if result is None or result == (None, None):
-        return jsonify({'nodes': [], 'edges': []})
+    # Graph and node list under the manager lock, so a concurrent add/delete cannot
+    # shift rows between reading the graph and reading the memories
+    with mm._lock:
+        # Use the comprehensive function to get the sparse connection graph (preserve reinforcement)
+        graph, _ = mm._calculate_scores_and_graph(threshold, preserve_reinforcement=True)
+        if graph is None:
+            return jsonify({'nodes': [], 'edges': []})
     
-    connections, sim_matrix = result
-    all_mems = mm._get_all_memories_flat()
-    nodes = []
-    edges = []
-
-    # Build nodes
-    for mem in all_mems:
-        nodes.append({
-            'id': mem['id'],
-            'label': mem['content'],
-            'score': mem.get('score', 0),
-            'created': mem.get('created', ''),
-            'tags': mem.get('tags', []),
-            'size': 20 + min(mem.get('score', 0), 100) * 0.5,  # Node size by score
-        })
+        all_mems = mm.search_index_map
+        nodes = []
+        edges = []
+
+        # Build nodes
+        for mem in all_mems:
+            nodes.append({
+                'id': mem['id'],
+                'label': mem['content'],
+                'score': mem.get('score', 0),
+                'created': mem.get('created', ''),
+                'tags': mem.get('tags', []),
+                'size': 20 + min(mem.get('score', 0), 100) * 0.5,  # Node size by score
+            })
 
-    # Build edges from the connection graph
-    n = len(all_mems)
-    for i in range(n):
-        for j, sim in connections[i]:
-            if i < j:  # Avoid duplicate edges
-                edges.append({
-                    'from': all_mems[i]['id'],
-                    'to': all_mems[j]['id'],
-                    'value': sim,
-                    'color': 'rgba(168,85,247,' + str(min(1, sim)) + ')',
-                    'width': 2 + 12 * sim,  # Match frontend scaling
-                    'type': 'semantic'
-                })
+        # Build edges from the sparse connection graph (each undirected edge once)
+        rows, cols, sims = graph.upper_edges()
+        for i, j, sim in zip(rows.tolist(), cols.tolist(), sims.tolist()):
+            edges.append({
+                'from': all_mems[i]['id'],
+                'to': all_mems[j]['id'],
+                'value': sim,
+                'color': 'rgba(168,85,247,' + str(min(1, sim)) + ')',
+                'width': 2 + 12 * sim,  # Match frontend scaling
+                'type': 'semantic'
+            })
 
     return jsonify({'nodes': nodes, 'edges': edges})
 
 @app.route('/score-updates')
 def get_score_updates():
-    """Get updated scores for all memories for live score updates"""
+    """Scores for live updates: only memories changed since ?since=<generation>&epoch=<epoch>, or all of them"""
     try:
-        # Get all memories with current scores (don't recalculate to preserve reinforcement)
-        all_mems = mm._get_all_memories_flat()
+        # Current scores, without recalculating (to preserve reinforcement)
+        memories, generation, epoch, full = mm.get_score_updates(request.args.get('since', type=int),
+                                                                 request.args.get('epoch'))
         
         # Return only the essential data for score updates
         score_updates = []
-        for mem in all_mems:
+        for mem in memories:
             score_updates.append({
                 'id': mem['id'],
                 'score': mem.get('score', 0),
@@ -150,6 +165,9 @@ def get_score_updates():
         return jsonify({
             'success': True,
             'updates': score_updates,
+            'generation': generation,
+            'epoch': epoch,
+            'full': full,
             'timestamp': mm._get_last_update_time()
         })
     except Exception as e:
@@ -0,0 +1,105 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future
+import numpy as np
+
+
+class BatchEncoder:
+    """
+    Micro-batching front end for a sentence encoder.
+
+    Callers submit lists of texts and get a Future for their embeddings. A
+    worker thread collects requests for up to `max_wait` seconds (or until
+    `max_batch_size` texts are pending), encodes the unique texts in one call
+    and hands each caller its slice. Concurrent single-query searches thus
+    share one forward pass instead of running many batch-of-one calls.
+    """
+
+    def __init__(self, encode_fn, max_wait=0.005, max_batch_size=64):
+        self.encode_fn = encode_fn
+        self.max_wait = max_wait
+        self.max_batch_size = max_batch_size
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread = None
+        self.batches = 0
+        self.requests = 0
+        self.texts_encoded = 0
+
+    def _ensure_worker(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='batch-encoder', daemon=True)
+                self._thread.start()
+
+    def submit(self, texts):
+        """Queue texts for encoding; the Future resolves to a float32 (len(texts), dim) array."""
+        future = Future()
+        self._ensure_worker()
+        self._queue.put((list(texts), future))
+        return future
+
+    def encode(self, texts):
+        return self.submit(texts).result()
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            batch = [item]
+            pending = len(item[0])
+            stopping = False
+            deadline = time.monotonic() + self.max_wait
+            while pending < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+                pending += len(item[0])
+            self._encode_batch(batch)
+            if stopping:
+                return
+
+    def _encode_batch(self, batch):
+        unique = {}
+        for texts, _ in batch:
+            for text in texts:
+                unique.setdefault(text, len(unique))
+        try:
+            embeddings = np.asarray(self.encode_fn(list(unique)), dtype=np.float32) if unique else None
+        except Exception as e:
+            for _, future in batch:
+                future.set_exception(e)
+            return
+        for texts, future in batch:
+            if texts:
+                future.set_result(embeddings[[unique[text] for text in texts]])
+            else:
+                future.set_result(np.zeros((0, 0), dtype=np.float32))
+        self.batches += 1
+        self.requests += len(batch)
+        self.texts_encoded += len(unique)
+
+    def stop(self):
+        """Finish queued requests and stop the worker."""
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None and thread.is_alive():
+            self._queue.put(None)
+            thread.join(timeout=30)
+
+    def get_stats(self):
+        return {
+            'batches': self.batches,
+            'requests': self.requests,
+            'texts_encoded': self.texts_encoded,
+        }
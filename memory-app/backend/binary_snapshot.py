@@ -0,0 +1,121 @@
+import json
+import os
+import uuid
+import numpy as np
+
+CORE_FIELDS = ('id', 'content', 'score')
+
+
+class BinarySnapshot:
+    """
+    Binary cold-start snapshot of the memories and their embedding matrix.
+
+    Files, next to memories.json:
+        <prefix>.npz              columnar sidecar: header, ids, scores,
+                                  content offsets and the remaining fields
+        <prefix>.<token>.npy      embedding matrix (float32 or float16)
+        <prefix>.<token>.bin      UTF-8 contents, sliced by the offsets
+    The sidecar is replaced last and names the token of its data files, so a
+    crash while writing leaves the previous snapshot intact. float32 matrices
+    are memory-mapped copy-on-write; float16 ones are upcast on load.
+    """
+
+    DTYPES = ('float32', 'float16')
+
+    def __init__(self, prefix, dtype='float32'):
+        if dtype not in self.DTYPES:
+            raise ValueError(f"Unsupported snapshot dtype '{dtype}', expected one of {list(self.DTYPES)}")
+        self.prefix = prefix
+        self.dtype = dtype
+        self.sidecar_path = prefix + '.npz'
+
+    def _data_paths(self, token):
+        return f"{self.prefix}.{token}.npy", f"{self.prefix}.{token}.bin"
+
+    def write(self, memories, embeddings, header):
+        """Write memories (in index row order) and their embedding rows."""
+        directory = os.path.dirname(self.prefix)
+        os.makedirs(directory, exist_ok=True)
+        token = uuid.uuid4().hex[:12]
+        embeddings_path, content_path = self._data_paths(token)
+
+        contents = [mem['content'].encode('utf-8') for mem in memories]
+        offsets = np.zeros(len(contents) + 1, dtype=np.int64)
+        np.cumsum([len(c) for c in contents], out=offsets[1:])
+        with open(content_path, 'wb') as f:
+            f.write(b''.join(contents))
+        np.save(embeddings_path, np.asarray(embeddings, dtype=self.dtype))
+
+        attrs = [{k: v for k, v in mem.items() if k not in CORE_FIELDS} for mem in memories]
+        header = {**header, 'token': token, 'count': len(memories)}
+        temp_path = self.sidecar_path + '.tmp.npz'
+        np.savez(temp_path,
+                 header=np.array(json.dumps(header)),
+                 ids=np.array([mem['id'] for mem in memories], dtype=np.str_),
+                 scores=np.array([mem.get('score', 0) for mem in memories], dtype=np.float64),
+                 offsets=offsets,
+                 attrs=np.array(json.dumps(attrs, ensure_ascii=False)))
+        os.replace(temp_path, self.sidecar_path)
+        self._remove_stale_files(token)
+
+    def remove(self):
+        """Delete the snapshot, e.g. once there is nothing valid left to describe."""
+        try:
+            os.remove(self.sidecar_path)
+        except OSError:
+            pass
+        self._remove_stale_files(None)
+
+    def _remove_stale_files(self, keep_token):
+        directory = os.path.dirname(self.prefix)
+        if not os.path.isdir(directory):
+            return
+        base = os.path.basename(self.prefix) + '.'
+        keep = {os.path.basename(p) for p in self._data_paths(keep_token)} if keep_token else set()
+        for name in os.listdir(directory):
+            if name.startswith(base) and name.endswith(('.npy', '.bin')) and name not in keep:
+                try:
+                    os.remove(os.path.join(directory, name))
+                except OSError:
+                    pass
+
+    def read_header(self):
+        """Return the sidecar header, or None if there is no readable snapshot."""
+        try:
+            with np.load(self.sidecar_path) as sidecar:
+                return json.loads(str(sidecar['header']))
+        except (IOError, OSError, ValueError, KeyError):
+            return None
+
+    def load(self):
+        """
+        Return (header, memories, embeddings) or None if the snapshot is missing
+        or incomplete.
+        """
+        try:
+            with np.load(self.sidecar_path) as sidecar:
+                header = json.loads(str(sidecar['header']))
+                ids = sidecar['ids'].tolist()
+                scores = sidecar['scores'].tolist()
+                offsets = sidecar['offsets'].tolist()
+                attrs = json.loads(str(sidecar['attrs']))
+            embeddings_path, content_path = self._data_paths(header['token'])
+            with open(content_path, 'rb') as f:
+                blob = f.read()
+            embeddings = np.load(embeddings_path, mmap_mode='c')
+        except (IOError, OSError, ValueError, KeyError) as e:
+            print(f"[BinarySnapshot] Could not load snapshot ({e})")
+            return None
+
+        if embeddings.shape[0] != len(ids) or len(blob) != offsets[-1] or header.get('count') != len(ids):
+            print("[BinarySnapshot] Snapshot files are inconsistent, ignoring them")
+            return None
+        if embeddings.dtype != np.float32:
+            embeddings = embeddings.astype(np.float32)
+
+        memories = [{'id': memory_id,
+                     'content': blob[offsets[i]:offsets[i + 1]].decode('utf-8'),
+                     'score': scores[i],
+                     **attrs[i]}
+                    for i, memory_id in enumerate(ids)]
+        return header, memories, embeddings
@@ -9,6 +9,7 @@ import logging
 from sentence_transformers import SentenceTransformer
 from sklearn.metrics.pairwise import cosine_similarity
 from sklearn.preprocessing import normalize
+from write_ahead_log import load_json_with_wal
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -477,8 +478,8 @@ CREATE INDEX idx_connections_target ON memory_connections(target_memory_id);
             raise Exception("Supabase client not initialized. Please set up credentials.")
         
         try:
-            with open(json_file_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
+            # Include mutations still only in memories.json.wal
+            data = load_json_with_wal(json_file_path)
             
             memories = data.get('memories', [])
             migrated_count = 0
@@ -0,0 +1,225 @@
+import hashlib
+import os
+import threading
+import unicodedata
+from collections import OrderedDict
+import numpy as np
+
+
+class EmbeddingCache:
+    """
+    Persistent embedding store keyed by a hash of (model name, content).
+
+    Embeddings live in one append-only binary file per model:
+        [8-byte magic][uint32 dim][uint32 reserved] followed by fixed-size
+        records of [32-byte sha256 key][dim float32 values].
+    Only texts that were never seen before (new or edited memories) are sent
+    to the encoder; everything else is served from disk. The records are
+    memory-mapped rather than copied into the heap, so the cache adds no
+    resident float32 copy of every embedding next to the search index.
+    """
+
+    MAGIC = b'MMEMB001'
+    HEADER_SIZE = 16
+
+    def __init__(self, cache_dir, model_name):
+        self.cache_dir = cache_dir
+        self.model_name = model_name
+        safe_name = model_name.replace('/', '_').replace('\\', '_')
+        self.cache_path = os.path.join(cache_dir, f"{safe_name}.bin")
+        self.dim = None
+        self.hits = 0
+        self.misses = 0
+        self._rows = {}     # key (bytes) -> record number in the memory-mapped file
+        self._records = None
+        self._mapped = 0    # records of the file already indexed in _rows
+        self._vectors = {}  # key (bytes) -> float32 vector not backed by the file
+        self._lock = threading.Lock()
+        self._load()
+
+    def key_for(self, content):
+        """Hash of (model name, content) used as the cache key."""
+        return hashlib.sha256(f"{self.model_name}\x00{content}".encode('utf-8')).digest()
+
+    def __len__(self):
+        return len(self._rows) + len(self._vectors)
+
+    def __contains__(self, content):
+        key = self.key_for(content)
+        return key in self._rows or key in self._vectors
+
+    def _record_dtype(self, dim):
+        # Raw 32-byte key: an 'S32' field would strip trailing NUL bytes of the digest
+        return np.dtype([('key', 'V32'), ('vec', '<f4', (dim,))])
+
+    def _load(self):
+        if not os.path.exists(self.cache_path):
+            return
+        try:
+            with open(self.cache_path, 'rb') as f:
+                header = f.read(self.HEADER_SIZE)
+                if len(header) < self.HEADER_SIZE or header[:8] != self.MAGIC:
+                    print(f"[EmbeddingCache] Ignoring unreadable cache file {self.cache_path}")
+                    return
+            self.dim = int(np.frombuffer(header[8:12], dtype='<u4')[0])
+            # Cut off a trailing partial record left behind by an interrupted
+            # append, so later appends stay aligned
+            record_size = self._record_dtype(self.dim).itemsize
+            payload_size = os.path.getsize(self.cache_path) - self.HEADER_SIZE
+            if payload_size % record_size:
+                os.truncate(self.cache_path, self.HEADER_SIZE + payload_size - payload_size % record_size)
+            self._map_records()
+            print(f"[EmbeddingCache] Loaded {len(self._rows)} cached embeddings for {self.model_name}")
+        except (IOError, OSError, ValueError) as e:
+            print(f"[EmbeddingCache] Could not load cache ({e}), starting empty")
+            self._rows = {}
+            self._records = None
+            self._mapped = 0
+            self.dim = None
+
+    def _map_records(self):
+        """(Re)map the record region of the cache file and index the keys not seen yet."""
+        record_dtype = self._record_dtype(self.dim)
+        count = (os.path.getsize(self.cache_path) - self.HEADER_SIZE) // record_dtype.itemsize
+        if count <= 0:
+            return
+        self._records = np.memmap(self.cache_path, dtype=record_dtype, mode='r',
+                                  offset=self.HEADER_SIZE, shape=(count,))
+        keys = self._records['key']
+        for row in range(self._mapped, count):
+            self._rows.setdefault(bytes(keys[row]), row)
+        self._mapped = count
+
+    def _append(self, keys, vectors):
+        """
+        Append new records to the cache file (the cache is derivable, so no fsync).
+        Vectors that could not be written are kept in memory instead.
+        """
+        os.makedirs(self.cache_dir, exist_ok=True)
+        record_dtype = self._record_dtype(self.dim)
+        records = np.empty(len(keys), dtype=record_dtype)
+        records['key'] = keys
+        records['vec'] = vectors
+        new_file = not os.path.exists(self.cache_path) or os.path.getsize(self.cache_path) == 0
+        try:
+            with open(self.cache_path, 'ab') as f:
+                if new_file:
+                    f.write(self.MAGIC + np.array([self.dim, 0], dtype='<u4').tobytes())
+                    self._rows = {}
+                    self._mapped = 0
+                f.write(records.tobytes())
+            self._map_records()
+        except (IOError, OSError) as e:
+            print(f"[EmbeddingCache] Failed to persist {len(keys)} embeddings: {e}")
+            for key, vec in zip(keys, vectors):
+                self._vectors[key] = vec
+
+    def _lookup(self, keys):
+        """Stack the cached vectors of keys (all of which must be cached)."""
+        rows = [self._rows.get(key, -1) for key in keys]
+        for key, row in zip(keys, rows):
+            # -1 would silently index the last record, i.e. another text's vector
+            if row < 0 and key not in self._vectors:
+                raise KeyError(f"Embedding {key.hex()[:16]}... is not cached")
+        if self._vectors and any(row < 0 for row in rows):
+            return np.stack([self._records['vec'][row] if row >= 0 else self._vectors[key]
+                             for key, row in zip(keys, rows)]).astype(np.float32, copy=False)
+        return np.asarray(self._records['vec'][rows], dtype=np.float32)
+
+    def encode(self, texts, encode_fn):
+        """
+        Return a float32 (len(texts), dim) matrix of embeddings for texts.
+
+        Args:
+            texts: List of strings to embed
+            encode_fn: Callable taking a list of strings and returning their
+                       embeddings; only called with cache misses
+        """
+        if not texts:
+            return np.zeros((0, self.dim or 0), dtype=np.float32)
+
+        keys = [self.key_for(text) for text in texts]
+        with self._lock:
+            missing = {}
+            for key, text in zip(keys, texts):
+                if key not in self._rows and key not in self._vectors and key not in missing:
+                    missing[key] = text
+            self.hits += len(texts) - len(missing)
+            self.misses += len(missing)
+
+        if missing:
+            missing_keys = list(missing.keys())
+            encoded = np.asarray(encode_fn(list(missing.values())), dtype=np.float32)
+            with self._lock:
+                if self.dim is None:
+                    self.dim = encoded.shape[1]
+                self._append(missing_keys, encoded)
+
+        with self._lock:
+            return self._lookup(keys)
+
+    def get_stats(self):
+        return {
+            'model': self.model_name,
+            'entries': len(self),
+            'hits': self.hits,
+            'misses': self.misses,
+        }
+
+
+class QueryEmbeddingCache:
+    """
+    Bounded in-memory LRU cache of query embeddings keyed by (normalized query
+    text, model name). Normalization is Unicode NFC plus collapsed whitespace;
+    case is kept since it can change the embedding.
+    """
+
+    def __init__(self, maxsize=1024):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def normalize_query(query):
+        return ' '.join(unicodedata.normalize('NFC', query).split())
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, query, model_name):
+        """Return the cached embedding or None, counting a hit or miss."""
+        key = (self.normalize_query(query), model_name)
+        with self._lock:
+            embedding = self._entries.get(key)
+            if embedding is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return embedding
+
+    def put(self, query, model_name, embedding):
+        if self.maxsize <= 0:
+            return
+        embedding = np.array(embedding, dtype=np.float32)
+        embedding.setflags(write=False)  # Shared between callers
+        key = (self.normalize_query(query), model_name)
+        with self._lock:
+            self._entries[key] = embedding
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def get_stats(self):
+        return {
+            'entries': len(self._entries),
+            'maxsize': self.maxsize,
+            'hits': self.hits,
+            'misses': self.misses,
+        }
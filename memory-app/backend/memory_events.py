@@ -0,0 +1,130 @@
+import collections
+import itertools
+import json
+import threading
+import uuid
+
+
+class MemoryEventLog:
+    """
+    Append-only feed of new-memory events for the network UI.
+
+    Every event gets an increasing id. Readers keep their own cursor (the
+    last id they saw) instead of draining a shared queue, so any number of
+    open tabs can follow the feed without taking events from each other.
+    Browsers subscribe with EventSource (`stream`), which reconnects on its
+    own and sends back the last id it saw as Last-Event-ID. Old-style pollers
+    that send no cursor share one kept by `poll`.
+    Only the newest `maxlen` events are retained; a reader that fell further
+    behind is told it missed some and should reload.
+
+    Ids restart with every log, so cursors handed to clients are tokens of the
+    form '<epoch>:<id>' with a random epoch per log. A cursor from another
+    epoch (e.g. an earlier server process) is treated as having missed events.
+    """
+
+    # Cursor of a reader whose position in this log is unknown
+    UNKNOWN_CURSOR = -1
+
+    def __init__(self, maxlen=1000):
+        self._events = collections.deque(maxlen=maxlen)
+        self._last_id = 0
+        self._condition = threading.Condition()
+        self.epoch = uuid.uuid4().hex[:12]
+        self._poll_cursor = 0  # shared by poll() callers without a cursor
+
+    @property
+    def last_id(self):
+        with self._condition:
+            return self._last_id
+
+    def publish(self, data):
+        """Append an event and wake up waiting readers. Returns its id."""
+        with self._condition:
+            self._last_id += 1
+            self._events.append((self._last_id, data))
+            self._condition.notify_all()
+            return self._last_id
+
+    def since(self, cursor):
+        """
+        Events after cursor.
+
+        Returns:
+            (events, cursor, missed): a list of (id, data), the id to pass
+            next time, and whether events after the old cursor were dropped
+            (or the cursor is UNKNOWN_CURSOR)
+        """
+        with self._condition:
+            return self._since(cursor)
+
+    def poll(self, since=None):
+        """
+        New memories after the `since` cursor token, or, without one, after
+        what the previous cursorless poll returned (the first one gets every
+        retained event).
+
+        Returns:
+            (memories, cursor, missed): the event data, the cursor token to
+            pass next time, and whether events were missed
+        """
+        with self._condition:
+            cursor = self._poll_cursor if since is None else self.parse_cursor(since)
+            events, cursor, missed = self._since(cursor)
+            if since is None:
+                self._poll_cursor = cursor
+        return [data for _, data in events], self.format_cursor(cursor), missed
+
+    def wait(self, cursor, timeout=None):
+        """Like since(), but blocks up to timeout seconds for an event after cursor."""
+        with self._condition:
+            self._condition.wait_for(lambda: self._last_id != cursor, timeout)
+            return self._since(cursor)
+
+    def _since(self, cursor):
+        if cursor < 0 or cursor > self._last_id:
+            # Not a position in this log: replay what we have
+            return list(self._events), self._last_id, True
+        if not self._events:
+            return [], self._last_id, False
+        first_id = self._events[0][0]
+        start = max(0, cursor + 1 - first_id)
+        events = list(itertools.islice(self._events, start, None))
+        return events, self._last_id, cursor < first_id - 1
+
+    def stream(self, cursor, keepalive=15.0):
+        """
+        Server-Sent Events body: one 'memory' event per new memory, a 'resync'
+        event when the reader missed events, and a comment line every
+        `keepalive` seconds so proxies keep the connection open.
+        """
+        yield 'retry: 3000\n\n'
+        while True:
+            events, cursor, missed = self.wait(cursor, timeout=keepalive)
+            if missed:
+                yield f'id: {self.format_cursor(cursor)}\nevent: resync\ndata: {{}}\n\n'
+                continue
+            if not events:
+                yield ': keep-alive\n\n'
+            for event_id, data in events:
+                yield (f'id: {self.format_cursor(event_id)}\nevent: memory\n'
+                       f'data: {json.dumps(data, ensure_ascii=False)}\n\n')
+
+    def format_cursor(self, cursor):
+        """Cursor token handed to clients (SSE id, /new-memories 'cursor')."""
+        return f'{self.epoch}:{cursor}'
+
+    def parse_cursor(self, value):
+        """
+        Cursor from a Last-Event-ID header or ?since= parameter: the head of the
+        log when there is none, UNKNOWN_CURSOR when it belongs to another epoch.
+        """
+        if not value:
+            return self.last_id
+        epoch, _, cursor = str(value).rpartition(':')
+        if epoch != self.epoch:
+            return self.UNKNOWN_CURSOR
+        try:
+            return int(cursor)
+        except ValueError:
+            return self.UNKNOWN_CURSOR
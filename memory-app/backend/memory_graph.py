@@ -0,0 +1,309 @@
+import numpy as np
+from scipy import sparse
+
+# Connection weights used by the scoring step
+STRONG_SIMILARITY = 0.7
+MODERATE_SIMILARITY = 0.5
+
+# Rows of the similarity matrix computed at once by chunked_threshold_edges
+DEFAULT_BLOCK_SIZE = 1024
+
+
+def word_counts(memories):
+    """Number of whitespace-separated words in each memory's content."""
+    return np.fromiter((len(mem['content'].split()) for mem in memories),
+                       dtype=np.int64, count=len(memories))
+
+
+def required_similarities(counts, sim_threshold):
+    """
+    Per-memory similarity a connection to this memory must reach.
+    Short texts can be misleadingly similar, so they require more.
+    """
+    return np.where(counts <= 3, max(sim_threshold + 0.15, 0.6),
+                    np.where(counts <= 5, sim_threshold + 0.1, sim_threshold))
+
+
+def threshold_edges(sim_block, required, row_offset=0, col_offset=0):
+    """
+    Emit the upper-triangle edges of a block of similarity rows.
+
+    The requirement for a pair is driven by its shorter memory, and since the
+    per-memory requirement never grows with word count, the pair requirement is
+    simply the larger of the two per-memory requirements.
+
+    Args:
+        sim_block: (b, m) similarities of rows row_offset.. to columns col_offset..
+        required: (n,) output of required_similarities
+        row_offset: Global row number of the first row in sim_block
+        col_offset: Global column number of the first column in sim_block
+
+    Returns:
+        (rows, cols, sims) arrays with rows < cols, in row-major order
+    """
+    block_rows, block_cols = sim_block.shape
+    row_ids = np.arange(row_offset, row_offset + block_rows)
+    col_ids = np.arange(col_offset, col_offset + block_cols)
+    pair_required = np.maximum(required[row_ids, None], required[None, col_ids])
+    mask = sim_block >= pair_required
+    mask &= col_ids[None, :] > row_ids[:, None]
+    local_rows, local_cols = np.nonzero(mask)
+    return (local_rows + row_offset, local_cols + col_offset,
+            sim_block[local_rows, local_cols])
+
+
+def chunked_threshold_edges(embeddings, required, block_size=DEFAULT_BLOCK_SIZE):
+    """
+    Threshold edges of the cosine similarity graph, computed one block of rows
+    at a time against the columns to their right. Peak memory is
+    O(block_size * n) and the dense n x n matrix is never materialized.
+
+    Args:
+        embeddings: (n, d) L2-normalized embeddings
+        required: (n,) output of required_similarities
+        block_size: Rows per block
+
+    Returns:
+        (rows, cols, sims) arrays with rows < cols, in row-major order
+    """
+    n = embeddings.shape[0]
+    block_size = max(1, int(block_size))
+    all_rows, all_cols, all_sims = [], [], []
+    for start in range(0, n, block_size):
+        end = min(start + block_size, n)
+        sim_block = embeddings[start:end] @ embeddings[start:].T
+        rows, cols, sims = threshold_edges(sim_block, required, row_offset=start, col_offset=start)
+        all_rows.append(rows)
+        all_cols.append(cols)
+        all_sims.append(sims)
+    if not all_rows:
+        return (np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64),
+                np.zeros(0, dtype=np.float32))
+    return np.concatenate(all_rows), np.concatenate(all_cols), np.concatenate(all_sims)
+
+
+def chunked_knn_edges(embeddings, required, k, mutual=False, block_size=DEFAULT_BLOCK_SIZE):
+    """
+    Bounded-degree variant of chunked_threshold_edges: each memory keeps only
+    its k most similar memories among those above the pair requirement.
+
+    Args:
+        embeddings: (n, d) L2-normalized embeddings
+        required: (n,) output of required_similarities
+        k: Neighbours kept per memory
+        mutual: Keep an edge only if each end is among the other's k nearest
+                (degree <= k) instead of if either is (union, degree usually ~k)
+        block_size: Rows per block
+
+    Returns:
+        (rows, cols, sims) arrays with rows < cols, in row-major order
+    """
+    n = embeddings.shape[0]
+    k = min(int(k), n - 1)
+    if k <= 0:
+        return (np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64),
+                np.zeros(0, dtype=np.float32))
+    block_size = max(1, int(block_size))
+    all_rows, all_cols, all_sims = [], [], []
+    for start in range(0, n, block_size):
+        end = min(start + block_size, n)
+        row_ids = np.arange(start, end)
+        sim_block = embeddings[start:end] @ embeddings.T
+        below = sim_block < np.maximum(required[row_ids, None], required[None, :])
+        sim_block[below] = -np.inf
+        sim_block[np.arange(end - start), row_ids] = -np.inf  # no self edges
+        top = np.argpartition(sim_block, -k, axis=1)[:, -k:]
+        top_sims = np.take_along_axis(sim_block, top, axis=1)
+        local_rows, slots = np.nonzero(np.isfinite(top_sims))
+        all_rows.append(row_ids[local_rows])
+        all_cols.append(top[local_rows, slots])
+        all_sims.append(top_sims[local_rows, slots])
+    rows, cols, sims = (np.concatenate(all_rows), np.concatenate(all_cols),
+                        np.concatenate(all_sims).astype(np.float32))
+
+    # Each directed neighbour pick becomes an undirected (low, high) pair;
+    # a pair picked from both ends appears twice
+    low, high = np.minimum(rows, cols), np.maximum(rows, cols)
+    pairs, first, picks = np.unique(low * n + high, return_index=True, return_counts=True)
+    keep = picks == 2 if mutual else np.ones(len(pairs), dtype=bool)
+    return pairs[keep] // n, pairs[keep] % n, sims[first[keep]]
+
+
+def connection_base_scores(n, rows, cols, sims, counts):
+    """
+    Connection-driven base score for every memory: weighted similarity of its
+    connections, a hub bonus and a content length bonus.
+    """
+    weighted = _connection_weights(sims)
+    # (bincount returns int64 for empty input even with weights, hence the cast)
+    weighted_sums = (np.bincount(rows, weights=weighted, minlength=n) +
+                     np.bincount(cols, weights=weighted, minlength=n)).astype(np.float64)
+    degree = np.bincount(rows, minlength=n) + np.bincount(cols, minlength=n)
+    return _base_scores(weighted_sums, degree, counts)
+
+
+def node_base_scores(graph, nodes, counts):
+    """
+    connection_base_scores for just `nodes`, read from their adjacency rows.
+    Used to refresh the memories whose connections changed after an insert or delete.
+    """
+    nodes = np.asarray(nodes, dtype=np.int64)
+    adjacency = graph.adjacency[nodes]
+    degree = np.diff(adjacency.indptr)
+    owners = np.repeat(np.arange(len(nodes)), degree)
+    weighted_sums = np.bincount(owners, weights=_connection_weights(adjacency.data),
+                                minlength=len(nodes)).astype(np.float64)
+    return _base_scores(weighted_sums, degree, counts[nodes])
+
+
+def _connection_weights(sims):
+    """Similarity of each connection times its strength weight (3 strong, 2 moderate, 1 weak)."""
+    sims = np.asarray(sims, dtype=np.float64)
+    weights = np.where(sims >= STRONG_SIMILARITY, 3.0,
+                       np.where(sims >= MODERATE_SIMILARITY, 2.0, 1.0))
+    return sims * weights
+
+
+def _base_scores(weighted_sums, degree, counts):
+    # Bonus for being a hub (connected to many relevant memories)
+    base_scores = weighted_sums + np.where(degree >= 3, degree * 0.1, 0.0)
+
+    # Content quality bonus (longer, more detailed memories)
+    base_scores += np.where(counts >= 10, 0.2, np.where(counts >= 5, 0.1, 0.0))
+    return base_scores
+
+
+class MemoryGraph:
+    """
+    Symmetric memory similarity graph stored as a scipy.sparse CSR matrix.
+
+    Row/column i is the memory with id `ids[i]` (search index row order).
+    `to_connections()` adapts it to the legacy list of (neighbor, sim) tuples.
+    """
+
+    def __init__(self, adjacency, ids):
+        self.adjacency = adjacency.tocsr()
+        self.adjacency.sort_indices()
+        self.ids = np.asarray(ids, dtype=object)
+        self.index_of = {memory_id: i for i, memory_id in enumerate(ids)}
+        self._connections = None
+        self._binary_adjacency = None
+
+    @classmethod
+    def from_edges(cls, ids, rows, cols, sims):
+        """Build from upper-triangle edges; both directions are stored."""
+        n = len(ids)
+        data = np.concatenate([sims, sims]).astype(np.float32)
+        row_idx = np.concatenate([rows, cols])
+        col_idx = np.concatenate([cols, rows])
+        adjacency = sparse.csr_matrix((data, (row_idx, col_idx)), shape=(n, n))
+        return cls(adjacency, ids)
+
+    def with_node(self, memory_id, neighbors, sims):
+        """Copy of the graph with memory_id appended as the last node, connected to `neighbors`."""
+        n = len(self)
+        padded = sparse.csr_matrix((self.adjacency.data, self.adjacency.indices,
+                                    np.append(self.adjacency.indptr, self.adjacency.nnz)),
+                                   shape=(n + 1, n + 1))
+        neighbors = np.asarray(neighbors, dtype=np.int64)
+        new_node = np.full(len(neighbors), n, dtype=np.int64)
+        sims = np.asarray(sims, dtype=np.float32)
+        new_edges = sparse.csr_matrix(
+            (np.concatenate([sims, sims]),
+             (np.concatenate([new_node, neighbors]), np.concatenate([neighbors, new_node]))),
+            shape=(n + 1, n + 1))
+        return MemoryGraph(padded + new_edges, self.ids.tolist() + [memory_id])
+
+    def without_node(self, i):
+        """Copy of the graph with node i and its edges removed; later nodes shift down by one."""
+        keep = np.delete(np.arange(len(self)), i)
+        return MemoryGraph(self.adjacency[keep][:, keep], np.delete(self.ids, i).tolist())
+
+    def __len__(self):
+        return self.adjacency.shape[0]
+
+    @property
+    def edge_count(self):
+        """Number of undirected edges."""
+        return self.adjacency.nnz // 2
+
+    def degrees(self):
+        return np.diff(self.adjacency.indptr)
+
+    def binary_adjacency(self):
+        """Adjacency with every edge weight set to 1 (for path counting)."""
+        if self._binary_adjacency is None:
+            binary = self.adjacency.copy()
+            binary.data = np.ones_like(binary.data)
+            self._binary_adjacency = binary
+        return self._binary_adjacency
+
+    def neighbors(self, i):
+        """(neighbor_indices, similarities) of memory row i."""
+        start, end = self.adjacency.indptr[i], self.adjacency.indptr[i + 1]
+        return self.adjacency.indices[start:end], self.adjacency.data[start:end]
+
+    def upper_edges(self):
+        """(rows, cols, sims) for every undirected edge once, with rows < cols."""
+        coo = sparse.triu(self.adjacency, k=1).tocoo()
+        order = np.lexsort((coo.col, coo.row))
+        return coo.row[order], coo.col[order], coo.data[order]
+
+    def to_connections(self):
+        """Legacy adjacency: a list per memory of (neighbor_index, similarity) tuples."""
+        if self._connections is None:
+            indptr = self.adjacency.indptr
+            indices = self.adjacency.indices.tolist()
+            data = self.adjacency.data.tolist()
+            self._connections = [
+                list(zip(indices[indptr[i]:indptr[i + 1]], data[indptr[i]:indptr[i + 1]]))
+                for i in range(len(self))
+            ]
+        return self._connections
+
+
+def propagate_reinforcement(graph, sources, amounts, hops=3, decay=0.3, column_block=64):
+    """
+    Spread reinforcement from recalled memories through the graph with sparse
+    matrix products instead of walking neighbour lists.
+
+    Each source gets its full amount. A memory first reached at hop h gets
+    amount * decay**h for every edge into it from the hop h-1 frontier, and a
+    memory reached at an earlier hop (or the source itself) is not reinforced
+    again for that source. With the defaults this is the 100% / 30% / 9% / 2.7%
+    scheme. All sources are propagated together as the columns of one frontier
+    matrix, `column_block` columns at a time to bound memory.
+
+    Returns:
+        (reinforcement, touched): float64 (n,) amounts and a bool (n,) mask of
+        the memories that were reinforced
+    """
+    n = len(graph)
+    sources = np.asarray(sources, dtype=np.int64)
+    amounts = np.asarray(amounts, dtype=np.float64)
+    reinforcement = np.bincount(sources, weights=amounts, minlength=n).astype(np.float64)
+    touched = np.zeros(n, dtype=bool)
+    touched[sources] = True
+    if len(sources) == 0 or hops <= 0:
+        return reinforcement, touched
+
+    adjacency = graph.binary_adjacency()
+    for start in range(0, len(sources), column_block):
+        block_sources = sources[start:start + column_block]
+        block_amounts = amounts[start:start + column_block]
+        columns = np.arange(len(block_sources))
+        frontier = np.zeros((n, len(block_sources)), dtype=np.float32)
+        frontier[block_sources, columns] = 1.0
+        visited = frontier > 0
+        for hop in range(1, hops + 1):
+            # Paths into each memory from the previous hop's frontier
+            counts = np.asarray(adjacency @ frontier)
+            counts[visited] = 0.0
+            reached = counts > 0
+            if not reached.any():
+                break
+            reinforcement += counts.astype(np.float64) @ (block_amounts * decay ** hop)
+            touched |= reached.any(axis=1)
+            visited |= reached
+            frontier = reached.astype(np.float32)
+    return reinforcement, touched
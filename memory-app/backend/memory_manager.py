@@ -2,51 +2,387 @@ import json
 from datetime import datetime
 import uuid
 import os
+import atexit
+import functools
+import threading
+import time
+from collections import OrderedDict
 import numpy as np
 from sentence_transformers import SentenceTransformer
 from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.metrics.pairwise import cosine_similarity
-from sklearn.preprocessing import normalize
+from embedding_cache import EmbeddingCache, QueryEmbeddingCache
+from search_index import SearchIndex, top_k_indices, normalize_rows
+from ann_index import create_ann_index
+from reinforcement_queue import ReinforcementQueue
+from write_ahead_log import WriteAheadLog, apply_wal_records
+from sqlite_store import SQLiteMemoryStore, SQLiteEmbeddingCache
+from binary_snapshot import BinarySnapshot
+from write_behind import WriteBehind
+from batch_encoder import BatchEncoder
+from memory_graph import (MemoryGraph, DEFAULT_BLOCK_SIZE, word_counts, required_similarities,
+                          chunked_threshold_edges, chunked_knn_edges, connection_base_scores,
+                          node_base_scores,
+                          propagate_reinforcement)
+
+def _synchronized(method):
+    """Run a MemoryManager method under the instance lock (an RLock, so calls may nest)."""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._lock:
+            return method(self, *args, **kwargs)
+    return wrapper
 
 class MemoryManager:
-    def __init__(self, db_path='data/memories.json'):
+    GRAPH_MODES = ('threshold', 'knn-union', 'knn-mutual')
+    REINFORCEMENT_MODES = ('background', 'sync')
+
+    def __init__(self, db_path='data/memories.json', similarity_block_size=None,
+                 ann_backend=None, ann_candidate_factor=10, reinforcement_mode=None,
+                 reinforcement_hops=None, reinforcement_decay=None, storage_backend=None,
+                 binary_snapshot=None, snapshot_dtype=None, flush_interval_ms=None, fsync_policy=None,
+                 index_precision=None, rerank_factor=None, graph_mode=None, graph_k=None):
         base_dir = os.path.dirname(os.path.abspath(__file__))
         self.db_path = os.path.join(base_dir, db_path)
-        self.memories = self._load_memories()
+        # Guards memories, scores and the search index against the background workers
+        self._lock = threading.RLock()
+        
+        # Durability of persisted writes: 'always' fsyncs every write, 'interval' at
+        # most every MEMORY_FSYNC_INTERVAL_MS, 'never' leaves it to the OS
+        self.fsync_policy = fsync_policy or os.getenv('MEMORY_FSYNC_POLICY', 'always')
+        if self.fsync_policy not in WriteAheadLog.FSYNC_POLICIES:
+            raise ValueError(f"Unknown fsync policy '{self.fsync_policy}', "
+                             f"expected one of {list(WriteAheadLog.FSYNC_POLICIES)}")
+        
+        # 'json' keeps memories.json plus its write-ahead log; 'sqlite' stores memories
+        # and embeddings in memories.db (migrated from memories.json on first start)
+        storage_backend = storage_backend or os.getenv('MEMORY_STORAGE_BACKEND', 'json')
+        if storage_backend not in ('json', 'sqlite'):
+            raise ValueError(f"Unknown storage backend '{storage_backend}', expected 'json' or 'sqlite'")
+        self.storage_backend = storage_backend
+        self.store = None
+        if storage_backend == 'sqlite':
+            self.store = SQLiteMemoryStore(os.path.splitext(self.db_path)[0] + '.db', fsync=self.fsync_policy)
+        
+        # Mutations are appended to a write-ahead log and folded into a full
+        # memories.json snapshot every wal_compact_records records
+        self.wal = WriteAheadLog(self.db_path + '.wal', fsync=self.fsync_policy,
+                                 fsync_interval=int(os.getenv('MEMORY_FSYNC_INTERVAL_MS', '1000')) / 1000)
+        self.wal_compact_records = int(os.getenv('MEMORY_WAL_COMPACT_RECORDS', '1000'))
+        self._wal_generation = None
+        self._dirty_scores = set()  # ids whose score changed since it was last persisted
+        self._snapshot_pending = False  # a full snapshot was requested but not written yet
+        
+        # Score changes are written behind: coalesced and flushed at most every
+        # flush_interval_ms (0 writes through immediately)
+        if flush_interval_ms is None:
+            flush_interval_ms = int(os.getenv('MEMORY_FLUSH_INTERVAL_MS', '250'))
+        self.write_behind = None
+        if flush_interval_ms > 0:
+            self.write_behind = WriteBehind(self._flush_pending, interval=flush_interval_ms / 1000)
+        
+        # Binary snapshot of memories + embedding matrix (memories.snapshot.*), written
+        # after a cold build and on close. While it matches the storage files, startup
+        # memory-maps it instead of parsing memories.json and encoding every memory.
+        if binary_snapshot is None:
+            binary_snapshot = os.getenv('MEMORY_BINARY_SNAPSHOT', 'true').lower() == 'true'
+        self.snapshot = None
+        if binary_snapshot:
+            self.snapshot = BinarySnapshot(os.path.splitext(self.db_path)[0] + '.snapshot',
+                                           dtype=snapshot_dtype or os.getenv('MEMORY_SNAPSHOT_DTYPE', 'float32'))
+        self._snapshot_fingerprint = None
+        snapshot = self._load_binary_snapshot()
+        self.memories = {'memories': snapshot[1]} if snapshot else self._load_memories()
+        
+        # Storage fingerprint and write-ahead log offset the in-memory state reflects;
+        # reload_from_disk returns immediately while the fingerprint is unchanged
+        self._disk_fingerprint = None
+        self._wal_offset = 0
+        self._mark_disk_state()
+        
+        # Rows per block when computing the similarity graph (bounds peak memory)
+        if similarity_block_size is None:
+            similarity_block_size = int(os.getenv('MEMORY_SIMILARITY_BLOCK_SIZE', DEFAULT_BLOCK_SIZE))
+        self.similarity_block_size = similarity_block_size
+        # Connection graphs for the most recently used similarity thresholds. Each is
+        # valid while the search index generation is unchanged; add_memory and
+        # delete_memory patch them in place, score changes do not affect them.
+        self._graph_cache = OrderedDict()
+        self.graph_cache_size = int(os.getenv('MEMORY_GRAPH_CACHE_SIZE', '4'))
+        # 'threshold' connects every pair above the similarity threshold; 'knn-union' and
+        # 'knn-mutual' keep only each memory's graph_k strongest such connections
+        # (kept if either / both ends picked them), bounding edges to O(n * graph_k)
+        self.graph_mode = graph_mode or os.getenv('MEMORY_GRAPH_MODE', 'threshold')
+        if self.graph_mode not in self.GRAPH_MODES:
+            raise ValueError(f"Unknown graph mode '{self.graph_mode}', expected one of {list(self.GRAPH_MODES)}")
+        if graph_k is None:
+            graph_k = int(os.getenv('MEMORY_GRAPH_K', '10'))
+        self.graph_k = graph_k
+        self.graph_cache_hits = 0
+        self.graph_cache_misses = 0
         
         # Initialize TF-IDF for the default method
         self.vectorizer = TfidfVectorizer()
         
         # Lazy-load the SentenceTransformer model and search index
         self.st_model = None
-        self.search_embeddings = None
-        self.search_index_map = []
+        self.st_model_name = 'all-mpnet-base-v2'
+        self._model_lock = threading.Lock()
+        # Readiness: 'lazy' until start_warmup() runs, then 'warming' -> 'ready' or 'failed'
+        self._warmup_status = 'lazy'
+        self._warmup_thread = None
+        self._warmup_seconds = None
+        self._warmup_error = None
+        self.embedding_cache = self._create_embedding_cache(self.st_model_name)
+        # Model calls from searches, adds and index builds are micro-batched by one
+        # worker (MEMORY_ENCODER_BATCH_WAIT_MS=0 encodes in the calling thread)
+        encoder_wait_ms = float(os.getenv('MEMORY_ENCODER_BATCH_WAIT_MS', '5'))
+        self.encoder = None
+        if encoder_wait_ms > 0:
+            self.encoder = BatchEncoder(self._encode_with_model, max_wait=encoder_wait_ms / 1000,
+                                        max_batch_size=int(os.getenv('MEMORY_ENCODER_MAX_BATCH', '64')))
+        # Recent query embeddings, so repeated or retried searches skip the transformer
+        self.query_cache = QueryEmbeddingCache(maxsize=int(os.getenv('MEMORY_QUERY_CACHE_SIZE', '1024')))
+        # Index row storage: 'float32', 'float16' or 'int8' (scalar-quantized). Reduced
+        # precisions re-rank the top top_k * rerank_factor candidates in float32.
+        self.search_index = SearchIndex(precision=index_precision or os.getenv('MEMORY_INDEX_PRECISION', 'float32'))
+        if rerank_factor is None:
+            rerank_factor = int(os.getenv('MEMORY_RERANK_FACTOR', '4'))
+        self.rerank_factor = rerank_factor
+        
+        # Nearest-neighbour backend for search_memories ('exact' or 'ivf').
+        # Approximate backends return top_k * ann_candidate_factor candidates for re-ranking.
+        self.ann_index = create_ann_index(ann_backend)
+        self.ann_candidate_factor = ann_candidate_factor
+        
+        # Reinforcement runs off the search path by default ('background'), batching
+        # many searches per pass; 'sync' applies it before search_memories returns.
+        reinforcement_mode = reinforcement_mode or os.getenv('MEMORY_REINFORCEMENT_MODE', 'background')
+        if reinforcement_mode not in self.REINFORCEMENT_MODES:
+            raise ValueError(f"Unknown reinforcement mode '{reinforcement_mode}', "
+                             f"expected one of {list(self.REINFORCEMENT_MODES)}")
+        # How far reinforcement spreads through the graph, and how much it shrinks per hop
+        if reinforcement_hops is None:
+            reinforcement_hops = int(os.getenv('MEMORY_REINFORCEMENT_HOPS', '3'))
+        if reinforcement_decay is None:
+            reinforcement_decay = float(os.getenv('MEMORY_REINFORCEMENT_DECAY', '0.3'))
+        self.reinforcement_hops = reinforcement_hops
+        self.reinforcement_decay = reinforcement_decay
+        self.reinforcement_queue = None
+        if reinforcement_mode == 'background':
+            self.reinforcement_queue = ReinforcementQueue(
+                self._reinforce_recalled_memories,
+                flush_interval=float(os.getenv('MEMORY_REINFORCEMENT_FLUSH_INTERVAL', '2.0')),
+                max_batch_size=int(os.getenv('MEMORY_REINFORCEMENT_BATCH_SIZE', '32')),
+            )
+        atexit.register(self.close)
         
-        self._build_search_index() # Initial build
+        if snapshot and snapshot[0].get('model') == self.st_model_name:
+            self.search_index.reset(snapshot[1], snapshot[2], copy=False)
+            print(f"Search index loaded from binary snapshot ({len(snapshot[1])} memories).")
+        else:
+            self._build_search_index() # Initial build
+            self._write_binary_snapshot()
+
+    @property
+    def search_embeddings(self):
+        """Embedding rows of the live memories, aligned with search_index_map."""
+        if len(self.search_index) == 0:
+            return None
+        self._compact_search_index()
+        return self.search_index.embeddings
+
+    @property
+    def search_index_map(self):
+        """Memories in search index row order."""
+        if len(self.search_index) == 0:
+            return []
+        self._compact_search_index()
+        return self.search_index.memories
 
     def _lazy_load_st_model(self):
         if self.st_model is None:
-            print("Loading SentenceTransformer model... (one-time operation)")
-            self.st_model = SentenceTransformer('all-mpnet-base-v2')
-            print("Model loaded.")
+            # The warm-up thread and a request may both get here first
+            with self._model_lock:
+                if self.st_model is None:
+                    print("Loading SentenceTransformer model... (one-time operation)")
+                    self.st_model = SentenceTransformer(self.st_model_name)
+                    print("Model loaded.")
+
+    def start_warmup(self):
+        """
+        Load the model and run a warm-up encode in a background thread.
+        is_ready() stays False until it has finished, so a health check can keep
+        traffic away until the first request no longer pays for the model load.
+        """
+        if self._warmup_thread is not None:
+            return self._warmup_thread
+        self._warmup_status = 'warming'
+        self._warmup_thread = threading.Thread(target=self._warm_up, name='model-warmup', daemon=True)
+        self._warmup_thread.start()
+        return self._warmup_thread
+
+    def _warm_up(self):
+        started = time.perf_counter()
+        try:
+            self._lazy_load_st_model()
+            # Through the batcher, so its worker and the model's first-call allocations are paid here
+            self._encode_with_batcher(['Warming up the memory system.'])
+            self._warmup_status = 'ready'
+            print(f"🔥 Model warm-up finished in {time.perf_counter() - started:.1f}s")
+        except Exception as e:
+            self._warmup_error = str(e)
+            self._warmup_status = 'failed'
+            print(f"❌ Model warm-up failed: {e}")
+        self._warmup_seconds = round(time.perf_counter() - started, 3)
+
+    def is_ready(self):
+        """True once the warm-up finished, or right away if no warm-up was started."""
+        return self._warmup_status in ('lazy', 'ready')
+
+    def get_readiness(self):
+        return {
+            'ready': self.is_ready(),
+            'status': self._warmup_status,
+            'model': self.st_model_name,
+            'model_loaded': self.st_model is not None,
+            'warmup_seconds': self._warmup_seconds,
+            'error': self._warmup_error,
+        }
+
+    def _create_embedding_cache(self, model_name):
+        if self.store is not None:
+            return SQLiteEmbeddingCache(self.store, model_name)
+        cache_dir = os.path.join(os.path.dirname(self.db_path), 'embedding_cache')
+        return EmbeddingCache(cache_dir, model_name)
+
+    def _encode_texts(self, texts):
+        """
+        Encode texts through the persistent embedding cache.
+        Only new or edited contents reach the transformer, so the model is
+        loaded lazily on the first cache miss.
+        """
+        return self.embedding_cache.encode(texts, self._encode_with_batcher)
+
+    def _encode_with_model(self, texts):
+        self._lazy_load_st_model()
+        return self.st_model.encode(texts)
+
+    def _encode_with_batcher(self, texts):
+        """Encode through the micro-batching worker (blocks until the batch ran)."""
+        if self.encoder is None:
+            return self._encode_with_model(texts)
+        return self.encoder.encode(texts)
+
+    def _encode_query(self, query):
+        """Normalized query embedding, served from the query LRU cache when possible."""
+        model_name = self.st_model_name
+        query_embedding = self.query_cache.get(query, model_name)
+        if query_embedding is None:
+            query_embedding = normalize_rows(self._encode_with_batcher([query]))[0]
+            self.query_cache.put(query, model_name, query_embedding)
+        return query_embedding
 
     def _build_search_index(self):
         """Builds embeddings for all memories for fast semantic search."""
-        self._lazy_load_st_model()
         all_memories = self._get_all_memories_flat()
         
+        self.ann_index.reset()
         if not all_memories:
-            self.search_embeddings = None
-            self.search_index_map = []
+            self.search_index.clear()
             return
             
         print("Building search index...")
         memory_texts = [mem['content'] for mem in all_memories]
-        self.search_embeddings = self.st_model.encode(memory_texts)
-        self.search_index_map = all_memories
+        self.search_index.reset(all_memories, self._encode_texts(memory_texts))
         print("Search index built.")
 
+    def _append_to_search_index(self, memory):
+        """Index one memory: a single (cached) encode plus an amortized O(1) row append."""
+        embedding = self._encode_texts([memory['content']])[0]
+        self.search_index.append(memory, embedding)
+
+    def _remove_from_search_index(self, memory_id):
+        """Tombstone a memory's row, compacting once too many tombstones pile up."""
+        removed = self.search_index.remove(memory_id)
+        if removed and self.search_index.needs_compaction():
+            self._compact_search_index()
+        return removed
+
+    def _compact_search_index(self):
+        """Drop tombstoned rows. Returns the old->new row mapping, or None if nothing changed."""
+        old_to_new = self.search_index.compact()
+        if old_to_new is not None:
+            self.ann_index.remap(old_to_new)
+        return old_to_new
+
+    def _storage_fingerprint(self):
+        """Identifies the persisted state; a binary snapshot is only valid for an equal fingerprint."""
+        if self.store is not None:
+            return list(self.store.generation())
+        fingerprint = []
+        for path in (self.db_path, self.wal.path):
+            try:
+                stat = os.stat(path)
+                fingerprint.append([stat.st_mtime_ns, stat.st_size])
+            except OSError:
+                fingerprint.append(None)
+        return fingerprint
+
+    def _load_binary_snapshot(self):
+        """Return (header, memories, embeddings) from the binary snapshot if it is current."""
+        if self.snapshot is None:
+            return None
+        header = self.snapshot.read_header()
+        fingerprint = self._storage_fingerprint()
+        # A missing storage file means the snapshot no longer describes anything on disk
+        if header is None or None in fingerprint or header.get('fingerprint') != fingerprint:
+            return None
+        loaded = self.snapshot.load()
+        if loaded is None:
+            return None
+        header = loaded[0]
+        self._wal_generation = header.get('wal_generation')
+        self.wal.record_count = header.get('wal_records', 0)
+        self._snapshot_fingerprint = header['fingerprint']
+        return loaded
+
+    @_synchronized
+    def _write_binary_snapshot(self):
+        """Write the binary snapshot unless the persisted state is unchanged since the last one."""
+        if self.snapshot is None:
+            return
+        self._flush_pending()
+        fingerprint = self._storage_fingerprint()
+        if None in fingerprint or len(self.search_index) == 0:
+            # Storage files gone or no memories left: drop the snapshot rather than
+            # leave one behind that the next start could load
+            self.snapshot.remove()
+            self._snapshot_fingerprint = None
+            return
+        if fingerprint == self._snapshot_fingerprint:
+            return
+        header = {
+            'model': self.st_model_name,
+            'fingerprint': fingerprint,
+            'wal_generation': self._wal_generation,
+            'wal_records': self.wal.record_count,
+        }
+        try:
+            self.snapshot.write(self.search_index_map, self.search_embeddings, header)
+            self._snapshot_fingerprint = fingerprint
+        except (IOError, OSError) as e:
+            print(f"[MemoryManager] Failed to write binary snapshot: {e}")
+
     def _load_memories(self):
+        if self.store is not None:
+            if self.store.needs_migration():
+                has_json = os.path.exists(self.db_path) and os.path.getsize(self.db_path) > 0
+                self.store.migrate_from_json(self._load_json_memories() if has_json else {'memories': []})
+            return self.store.load()
+        return self._load_json_memories()
+
+    def _load_json_memories(self):
         if not os.path.exists(self.db_path) or os.path.getsize(self.db_path) == 0:
             default_memories = {"memories": []}
             self._save_memories_data(default_memories)
@@ -70,8 +406,27 @@ class MemoryManager:
             data = {"memories": all_mems}
             self._save_memories_data(data)
         
+        self._apply_wal(data)
         return data
 
+    def _apply_wal(self, data):
+        """Replay write-ahead log records made since the snapshot in data (crash recovery)."""
+        generation = data.pop('wal_generation', None)
+        self._wal_generation = generation
+        if not os.path.exists(self.wal.path):
+            # Start an empty log, so the storage fingerprint covers both files
+            self.wal.reset(generation)
+        log_generation, records = self.wal.read()
+        if not records:
+            return
+        if log_generation != generation:
+            # Left over from before the snapshot was written; already contained in it
+            print("[MemoryManager] Discarding write-ahead log from an older snapshot")
+            self.wal.reset(generation)
+            return
+        apply_wal_records(data, records)
+        print(f"[MemoryManager] Replayed {len(records)} write-ahead log records")
+
     def _save_memories_data(self, data):
         """Save memories data with file locking to prevent corruption."""
         import tempfile
@@ -127,7 +482,8 @@ class MemoryManager:
             with open(temp_path, 'w', encoding='utf-8') as f:
                 json.dump(data, f, indent=2, ensure_ascii=False)
                 f.flush()  # Ensure data is written to disk
-                os.fsync(f.fileno())  # Force write to disk
+                if self.fsync_policy != 'never':
+                    os.fsync(f.fileno())  # Force write to disk
             
             # Verify the temporary file is valid JSON
             with open(temp_path, 'r', encoding='utf-8') as f:
@@ -187,13 +543,102 @@ class MemoryManager:
                 except:
                     pass
 
+    def _mark_disk_state(self):
+        """Record the current storage fingerprint as already reflected in memory."""
+        self._disk_fingerprint = self._storage_fingerprint()
+        if self.store is None:
+            wal_stat = self._disk_fingerprint[1]
+            self._wal_offset = wal_stat[1] if wal_stat else 0
+
     def _save_memories(self):
-        self._save_memories_data(self.memories)
+        """Write a full snapshot and start a fresh write-ahead log."""
+        in_sync = self._disk_fingerprint == self._storage_fingerprint()
+        if self.store is not None:
+            self.store.replace_all(self.memories['memories'])
+        else:
+            generation = uuid.uuid4().hex
+            self._save_memories_data({**self.memories, 'wal_generation': generation})
+            self.wal.reset(generation)
+            self._wal_generation = generation
+        self._dirty_scores.clear()
+        # Our own write: don't make the next reload_from_disk re-read it
+        if in_sync:
+            self._mark_disk_state()
+
+    def _log_mutation(self, record):
+        """Append one mutation to the write-ahead log, compacting it into a snapshot when it grows."""
+        in_sync = self._disk_fingerprint == self._storage_fingerprint()
+        if self.store is not None:
+            # SQLite is already durable per statement: an INSERT, DELETE or score UPDATEs
+            self.store.apply(record)
+        else:
+            self.wal.append(record, self._wal_generation)
+            if self.wal.record_count >= self.wal_compact_records:
+                print(f"[MemoryManager] Compacting {self.wal.record_count} write-ahead log records into a snapshot")
+                self._save_memories()
+        if in_sync:
+            self._mark_disk_state()
+
+    def _schedule_persist(self, snapshot=False):
+        """Persist dirty scores (or a full snapshot) now, or on the next write-behind flush."""
+        if snapshot:
+            self._snapshot_pending = True
+        if self.write_behind is None:
+            self._flush_pending()
+        else:
+            self.write_behind.schedule()
+
+    @_synchronized
+    def _flush_pending(self):
+        """Write whatever _schedule_persist deferred."""
+        if self._snapshot_pending:
+            self._snapshot_pending = False
+            self._save_memories()
+        else:
+            self._persist_scores()
+
+    def flush(self):
+        """Persist all pending score changes now and fsync them regardless of the policy delay."""
+        if self.write_behind is not None:
+            self.write_behind.flush(force=True)
+        else:
+            self._flush_pending()
+        self.wal.sync()
+
+    def _persist_scores(self):
+        """Log the scores that changed since they were last persisted."""
+        if not self._dirty_scores:
+            return
+        index = self.search_index
+        scores = {}
+        for memory_id in self._dirty_scores:
+            row = index.row_by_id.get(memory_id)
+            if row is not None:
+                scores[memory_id] = index.memories[row].get('score', 0)
+        self._dirty_scores.clear()
+        if scores:
+            self._log_mutation({'op': 'scores', 'scores': scores})
 
     def _get_all_memories_flat(self):
         # Return flat list of all memories
         return self.memories.get('memories', []).copy()
 
+    def _set_memory_score(self, memory, score):
+        """Update a memory's score and the search index's score column."""
+        memory['score'] = score
+        self.search_index.set_score(memory['id'], score)
+        self._dirty_scores.add(memory['id'])
+
+    def _memories_with_scores(self):
+        """All memories plus a float64 array of their scores (the index column when in sync)."""
+        all_memories = self._get_all_memories_flat()
+        index = self.search_index
+        if index.tombstones == 0 and len(index) == len(all_memories):
+            return index.memories, index.scores
+        scores = np.fromiter((mem.get('score', 0) for mem in all_memories),
+                             dtype=np.float64, count=len(all_memories))
+        return all_memories, scores
+
     def _update_scores_tfidf(self, new_content):
         all_mems = self._get_all_memories_flat()
         if len(all_mems) == 0:
@@ -204,19 +649,17 @@ class MemoryManager:
             similarities = cosine_similarity(tfidf_matrix[-1], tfidf_matrix[:-1])[0]
             for i, memory in enumerate(all_mems):
                 if similarities[i] > 0.1:
-                    memory['score'] += similarities[i] * 10
+                    self._set_memory_score(memory, memory['score'] + similarities[i] * 10)
         except ValueError:
             pass # Vocabulary is empty
 
     def _update_scores_transformer(self, new_content):
-        self._lazy_load_st_model()
-        all_mems = self._get_all_memories_flat()
+        all_mems = self.search_index_map
         if len(all_mems) == 0:
             return
         
-        memory_texts = [mem['content'] for mem in all_mems]
-        memory_embeddings = self.st_model.encode(memory_texts)
-        new_embedding = self.st_model.encode([new_content])
+        memory_embeddings = self.search_embeddings  # already L2-normalized
+        new_embedding = normalize_rows(self._encode_texts([new_content]))
         
         similarities = np.dot(memory_embeddings, new_embedding.T).flatten()
         
@@ -224,9 +667,12 @@ class MemoryManager:
             if similarity > 0.6:
                 memory_to_update = all_mems[i]
                 score_increase = similarity * 30
-                memory_to_update['score'] = float(memory_to_update['score']) + float(score_increase)
+                self._set_memory_score(memory_to_update,
+                                       float(memory_to_update['score']) + float(score_increase))
     
-    def _calculate_all_scores_and_connections(self, sim_threshold=0.35, preserve_reinforcement=True):
+    @_synchronized
+    def _calculate_scores_and_graph(self, sim_threshold=0.35, preserve_reinforcement=True,
+                                    return_sim_matrix=False):
         """
         Comprehensive function that calculates all scores and connections.
         Uses much more accurate similarity thresholds and quality filtering.
@@ -238,95 +684,185 @@ class MemoryManager:
                          - 0.7-0.85: Strong connection
                          - 0.85+: Very strong connection
             preserve_reinforcement: If True, preserves existing reinforcement scores
+            return_sim_matrix: If True, also build the dense n x n similarity matrix.
+                         Edges are always computed blockwise without it.
+
+        Returns:
+            (MemoryGraph, sim_matrix or None), or (None, None) if there are no memories
         """
-        if self.search_embeddings is None:
+        if len(self.search_index) == 0:
             self._build_search_index()
         
-        all_mems = self._get_all_memories_flat()
+        all_mems = self.search_index_map
         n = len(all_mems)
-        if n == 0 or self.search_embeddings is None:
+        if n == 0:
             return None, None
         
-        # 1. Calculate similarity matrix using proper cosine similarity
-        # Normalize embeddings to ensure cosine similarity is in [0,1] range
-        normalized_embeddings = normalize(self.search_embeddings, norm='l2')
-        sim_matrix = normalized_embeddings @ normalized_embeddings.T
+        # 1. Index rows are L2-normalized, so dot products are cosine similarities
+        #    (a transient float32 copy when the index stores reduced precision)
+        sim_matrix = None
+        if return_sim_matrix:
+            embeddings = self.search_embeddings
+            sim_matrix = embeddings @ embeddings.T
         
-        # 2. Build connection graph with much stricter thresholds
-        connections = [[] for _ in range(n)]
-        for i in range(n):
-            for j in range(i+1, n):
-                sim = float(sim_matrix[i, j])
-                
-                # Apply stricter similarity filtering
-                if sim >= sim_threshold:
-                    # Additional quality check: avoid connecting very short/generic texts
-                    mem_i_words = len(all_mems[i]['content'].split())
-                    mem_j_words = len(all_mems[j]['content'].split())
-                    
-                    # Require higher similarity for short texts (they can be misleadingly similar)
-                    min_words = min(mem_i_words, mem_j_words)
-                    if min_words <= 3:
-                        # For very short texts, require much higher similarity
-                        required_sim = max(sim_threshold + 0.15, 0.6)
-                    elif min_words <= 5:
-                        # For short texts, require moderately higher similarity  
-                        required_sim = sim_threshold + 0.1
-                    else:
-                        required_sim = sim_threshold
-                    
-                    if sim >= required_sim:
-                        connections[i].append((j, sim))
-                        connections[j].append((i, sim))
+        # 2. Connection graph and connection-driven base scores (cached per threshold)
+        graph, base_scores = self._connection_graph(sim_threshold)
         
         # 3. Calculate scores with weighted importance
         for i, mem in enumerate(all_mems):
-            # Store existing reinforcement score if preserving
-            existing_score = mem.get('score', 0) if preserve_reinforcement else 0
-            
-            # Calculate base score from connections
-            base_score = 0.0
-            connection_count = len(connections[i])
-            
-            # Base score from connections
-            for neighbor, sim in connections[i]:
-                # Weight stronger connections more heavily
-                if sim >= 0.7:
-                    weight = 3.0  # Strong connections
-                elif sim >= 0.5:
-                    weight = 2.0  # Moderate connections
-                else:
-                    weight = 1.0  # Weak connections
-                base_score += sim * weight
-            
-            # Bonus for being a hub (connected to many relevant memories)
-            if connection_count >= 3:
-                base_score += connection_count * 0.1
-            
-            # Content quality bonus (longer, more detailed memories)
-            word_count = len(mem['content'].split())
-            if word_count >= 10:
-                base_score += 0.2
-            elif word_count >= 5:
-                base_score += 0.1
-            
-            # Combine base score with existing reinforcement
-            if preserve_reinforcement:
-                # Keep the higher of base score or existing score, but add some base score
-                final_score = max(existing_score, base_score * 0.5) + base_score * 0.3
-            else:
-                final_score = base_score
-                
-            mem['score'] = round(final_score, 2)
+            mem['score'] = self._combined_score(mem, float(base_scores[i]), preserve_reinforcement)
+        changed = self.search_index.refresh_scores()
+        self._dirty_scores.update(all_mems[i]['id'] for i in changed.tolist())
         
         # Only save if we're not preserving reinforcement (to avoid overwriting)
         if not preserve_reinforcement:
-            self._save_memories()
-        return connections, sim_matrix
+            self._schedule_persist(snapshot=True)
+        return graph, sim_matrix
+
+    @staticmethod
+    def _combined_score(memory, base_score, preserve_reinforcement=True):
+        """Combine a connection base score with the memory's existing (reinforced) score."""
+        if preserve_reinforcement:
+            # Keep the higher of base score or existing score, but add some base score
+            existing_score = memory.get('score', 0)
+            return round(max(existing_score, base_score * 0.5) + base_score * 0.3, 2)
+        return round(base_score, 2)
+
+    @_synchronized
+    def _connection_graph(self, sim_threshold):
+        """
+        (MemoryGraph, base scores) of the live index rows at sim_threshold.
+        Neither depends on scores, so both are reused until the search index
+        generation changes; otherwise edges are computed blockwise with much
+        stricter thresholds for short memories.
+        """
+        all_mems = self.search_index_map
+        generation = self.search_index.generation
+        key = float(sim_threshold)
+        cached = self._graph_cache.get(key)
+        if cached is not None and cached[0] == generation:
+            self._graph_cache.move_to_end(key)
+            self.graph_cache_hits += 1
+            return cached[1], cached[2]
+        
+        self.graph_cache_misses += 1
+        counts = word_counts(all_mems)
+        required = required_similarities(counts, sim_threshold)
+        if self.graph_mode == 'threshold':
+            rows, cols, sims = chunked_threshold_edges(self.search_embeddings, required,
+                                                       self.similarity_block_size)
+        else:
+            rows, cols, sims = chunked_knn_edges(self.search_embeddings, required, self.graph_k,
+                                                 mutual=self.graph_mode == 'knn-mutual',
+                                                 block_size=self.similarity_block_size)
+        graph = MemoryGraph.from_edges([mem['id'] for mem in all_mems], rows, cols, sims)
+        base_scores = connection_base_scores(len(all_mems), rows, cols, sims, counts)
+        
+        self._graph_cache[key] = (generation, graph, base_scores, counts)
+        self._graph_cache.move_to_end(key)
+        while len(self._graph_cache) > self.graph_cache_size:
+            self._graph_cache.popitem(last=False)
+        return graph, base_scores
+
+    def _insert_into_cached_graphs(self, memory, generation):
+        """
+        Patch the cached graphs for a memory just appended to the search index:
+        one similarity row against the live rows gives its edges, and only the
+        base scores of the new node and its neighbours are recomputed.
+
+        Args:
+            generation: Search index generation before the append
+        Returns:
+            {threshold: affected node positions} for the patched graphs
+        """
+        index = self.search_index
+        if index.generation != generation + 1 or self.graph_mode != 'threshold':
+            # A kNN graph can lose edges elsewhere when neighbour lists change; rebuild it
+            self._graph_cache.clear()
+            return {}
+        stale = [key for key, entry in self._graph_cache.items() if entry[0] != generation]
+        for key in stale:
+            del self._graph_cache[key]
+        if not self._graph_cache:
+            return {}
+        
+        row = index.row_by_id[memory['id']]
+        live_rows = np.flatnonzero(index.alive)[:-1]  # the new row is the last live row
+        sims = index.dot(index.vectors([row])[0], live_rows)
+        word_count = len(memory['content'].split())
+        affected = {}
+        for key, (_, graph, base_scores, counts) in list(self._graph_cache.items()):
+            counts = np.append(counts, word_count)
+            required = required_similarities(counts, key)
+            neighbors = np.flatnonzero(sims >= np.maximum(required[:-1], required[-1]))
+            graph = graph.with_node(memory['id'], neighbors, sims[neighbors])
+            nodes = np.append(neighbors, len(graph) - 1)
+            base_scores = np.append(base_scores, 0.0)
+            base_scores[nodes] = node_base_scores(graph, nodes, counts)
+            self._graph_cache[key] = (index.generation, graph, base_scores, counts)
+            affected[key] = nodes
+        return affected
+
+    def _remove_from_cached_graphs(self, memory_id, generation):
+        """
+        Patch the cached graphs for a memory just removed from the search index:
+        its node and edges are dropped and its former neighbours are rescored.
+
+        Args:
+            generation: Search index generation before the removal
+        Returns:
+            {threshold: affected node positions} for the patched graphs
+        """
+        index = self.search_index
+        affected = {}
+        if self.graph_mode != 'threshold':
+            # Former neighbours may pick new ones, so a kNN graph is rebuilt
+            self._graph_cache.clear()
+            return affected
+        for key, (entry_generation, graph, base_scores, counts) in list(self._graph_cache.items()):
+            position = graph.index_of.get(memory_id)
+            if entry_generation != generation or index.generation != generation + 1 or position is None:
+                del self._graph_cache[key]
+                continue
+            neighbors, _ = graph.neighbors(position)
+            neighbors = neighbors - (neighbors > position)
+            graph = graph.without_node(position)
+            counts = np.delete(counts, position)
+            base_scores = np.delete(base_scores, position)
+            base_scores[neighbors] = node_base_scores(graph, neighbors, counts)
+            self._graph_cache[key] = (index.generation, graph, base_scores, counts)
+            affected[key] = neighbors
+        return affected
+
+    def _rescore_affected(self, affected, sim_threshold=0.35):
+        """
+        Update the scores of the memories whose connections changed, or rescore
+        everything if the graph for sim_threshold could not be patched.
+        """
+        key = float(sim_threshold)
+        if key not in affected:
+            self._recalculate_scores_by_connections(sim_threshold, preserve_reinforcement=True)
+            return
+        _, _, base_scores, _ = self._graph_cache[key]
+        all_mems = self.search_index_map
+        for i in affected[key].tolist():
+            memory = all_mems[i]
+            score = self._combined_score(memory, float(base_scores[i]))
+            if score != memory.get('score', 0):
+                self._set_memory_score(memory, score)
+
+    def _calculate_all_scores_and_connections(self, sim_threshold=0.35, preserve_reinforcement=True,
+                                              return_sim_matrix=False):
+        """Legacy wrapper - returns the graph as lists of (neighbor_index, sim) tuples."""
+        graph, sim_matrix = self._calculate_scores_and_graph(sim_threshold, preserve_reinforcement,
+                                                             return_sim_matrix)
+        if graph is None:
+            return None, None
+        return graph.to_connections(), sim_matrix
 
     def _recalculate_scores_by_connections(self, sim_threshold=0.35, preserve_reinforcement=True):
         """Legacy wrapper - now calls the comprehensive function."""
-        return self._calculate_all_scores_and_connections(sim_threshold, preserve_reinforcement)
+        return self._calculate_scores_and_graph(sim_threshold, preserve_reinforcement)
 
     def _update_scores_on_add(self, new_content, method='tfidf'):
         """Legacy wrapper - now just recalculates everything."""
@@ -335,6 +871,7 @@ class MemoryManager:
         # Recalculate all scores, preserving reinforcement
         self._calculate_all_scores_and_connections(sim_threshold=0.35, preserve_reinforcement=True)
 
+    @_synchronized
     def add_memory(self, content, tags=None, method='tfidf'):
         new_memory = {
             "id": f"mem_{uuid.uuid4()}",
@@ -344,58 +881,97 @@ class MemoryManager:
             "created": datetime.now().strftime("%Y-%m-%d")
         }
         # Always add to root level - no hierarchy
+        generation = self.search_index.generation
         self.memories['memories'].append(new_memory)
-        self._save_memories()
-        self._build_search_index()
-        self._recalculate_scores_by_connections(preserve_reinforcement=True)  # Preserve existing reinforcement
+        self._log_mutation({'op': 'add', 'memory': new_memory})
+        self._append_to_search_index(new_memory)
+        # Only the new memory and its neighbours get rescored (existing reinforcement is kept)
+        self._rescore_affected(self._insert_into_cached_graphs(new_memory, generation))
         return new_memory
 
     def search_memories(self, query, top_k=10, min_relevance=0.2):
         """Search like AI models do for web results with dynamic memory reinforcement"""
-        if self.search_embeddings is None or not self.search_index_map:
+        if len(self.search_index) == 0:
             print("Search index is empty. Returning all memories.")
             return self.get_all_memories().get('memories', [])
 
-        # 1. Semantic similarity search
-        query_embedding = self.st_model.encode([query])
-        similarities = np.dot(self.search_embeddings, query_embedding.T).flatten()
+        # 1. Semantic similarity search (the query is encoded outside the lock)
+        query_embedding = self._encode_query(query)
+        with self._lock:
+            index = self.search_index
+            # Candidate rows from the ANN backend (every live row for exact search)
+            candidates = top_k * self.ann_candidate_factor if self.ann_index.approximate else None
+            rows, similarities = self.ann_index.search(index, query_embedding, candidates)
+            if not index.exact:
+                rows, similarities = self._rerank_candidates(rows, similarities, query_embedding,
+                                                             top_k, min_relevance)
         
-        # 2. Combine semantic similarity with memory importance
-        scored_memories = []
-        recalled_memories = []  # Track which memories were recalled
+            # 2. Combine semantic similarity with memory importance (vectorized hybrid score)
+            similarities = similarities.astype(np.float64)
+            relevant = similarities > min_relevance
+            print(f"DEBUG: {int(relevant.sum())} of {len(relevant)} candidates above min_relevance {min_relevance}")
+            rows, similarities = rows[relevant], similarities[relevant]
+            final_scores = similarities * 0.7 + index.scores[rows] / 100 * 0.3
         
-        for i, similarity in enumerate(similarities):
-            # DEBUG: Log all similarities for debugging
-            memory = self.search_index_map[i]
-            print(f"DEBUG: Memory '{memory['content'][:30]}...' similarity: {similarity:.3f}, min_relevance: {min_relevance}")
-            
-            if similarity > min_relevance:
-                # Hybrid score: semantic relevance + memory importance
-                final_score = (float(similarity) * 0.7) + (memory.get('score', 0) / 100 * 0.3)
-                
-                scored_memories.append({
+            # 3. Select the top results without sorting every candidate
+            top_results = []
+            for i in top_k_indices(final_scores, top_k).tolist():
+                memory = index.memories[rows[i]]
+                top_results.append({
                     'memory': memory,
-                    'relevance_score': float(similarity),
+                    'relevance_score': float(similarities[i]),
                     'importance_score': memory.get('score', 0),
-                    'final_score': final_score
+                    'final_score': float(final_scores[i])
                 })
-                
-                # Track recalled memories for reinforcement
-                recalled_memories.append((memory['id'], float(similarity)))
-                print(f"DEBUG: ✅ INCLUDED - Score {similarity:.3f} > threshold {min_relevance}")
-            else:
-                print(f"DEBUG: ❌ FILTERED OUT - Score {similarity:.3f} <= threshold {min_relevance}")
-        
-        # 3. Sort and get top results
-        top_results = sorted(scored_memories, key=lambda x: x['final_score'], reverse=True)[:top_k]
+                print(f"DEBUG: ✅ INCLUDED '{memory['content'][:30]}...' - Score {similarities[i]:.3f} > threshold {min_relevance}")
         
         # 4. Reinforce recalled memories (only the top results that were actually returned)
         if top_results:
             top_recalled = [(result['memory']['id'], result['relevance_score']) for result in top_results]
-            self._reinforce_recalled_memories(top_recalled)
+            if self.reinforcement_queue is not None:
+                # Applied in a batch by the background worker
+                self.reinforcement_queue.enqueue(top_recalled)
+            else:
+                self._reinforce_recalled_memories(top_recalled)
         
         return top_results
 
+    # Headroom below min_relevance for similarities from reduced-precision rows
+    RERANK_MARGIN = 0.02
+
+    def _rerank_candidates(self, rows, similarities, query_embedding, top_k, min_relevance):
+        """
+        Recompute exact float32 similarities for the best top_k * rerank_factor
+        candidates of a reduced-precision index. The float32 vectors come from
+        the memory-mapped embedding cache, not from resident memory.
+        """
+        index = self.search_index
+        keep = similarities > min_relevance - self.RERANK_MARGIN
+        rows, similarities = rows[keep], similarities[keep]
+        approximate_scores = similarities * 0.7 + index.scores[rows] / 100 * 0.3
+        pool = top_k_indices(approximate_scores, top_k * self.rerank_factor)
+        rows = rows[pool]
+        exact_vectors = normalize_rows(self._encode_texts([index.memories[row]['content'] for row in rows.tolist()]))
+        return rows, exact_vectors @ query_embedding
+
+    def flush_reinforcements(self):
+        """Apply queued reinforcements now. Returns the number of searches applied."""
+        if self.reinforcement_queue is None:
+            return 0
+        return self.reinforcement_queue.flush()
+
+    def close(self):
+        """Stop background workers, applying anything still queued, and refresh the binary snapshot."""
+        if self.reinforcement_queue is not None:
+            self.reinforcement_queue.stop(flush=True)
+        if self.write_behind is not None:
+            self.write_behind.stop(flush=True)
+        if self.encoder is not None:
+            self.encoder.stop()
+        self.flush()
+        self._write_binary_snapshot()
+
+    @_synchronized
     def _reinforce_recalled_memories(self, recalled_memories):
         """
         Reinforce memories that were recalled by:
@@ -403,6 +979,9 @@ class MemoryManager:
         2. Adding 30% to immediate neighbors (connected memories)
         3. Adding 30% of that (9%) to neighbors of neighbors
         4. Adding 30% of that (2.7%) to third-degree neighbors
+        The hop count and the 30% decay are set by reinforcement_hops and
+        reinforcement_decay. Propagation is done with sparse matrix products
+        for all recalled memories at once.
         """
         if not recalled_memories:
             return
@@ -410,102 +989,52 @@ class MemoryManager:
         print(f"🧠 Reinforcing {len(recalled_memories)} recalled memories...")
         
         # Get current connection graph (preserve reinforcement scores)
-        result = self._calculate_all_scores_and_connections(sim_threshold=0.35, preserve_reinforcement=True)
-        if result is None or result == (None, None):
+        graph, _ = self._calculate_scores_and_graph(sim_threshold=0.35, preserve_reinforcement=True)
+        if graph is None:
             print("❌ No connection graph available for reinforcement")
             return
             
-        connections, sim_matrix = result
-        all_mems = self._get_all_memories_flat()
-        
-        # Create memory ID to index mapping
-        id_to_index = {mem['id']: i for i, mem in enumerate(all_mems)}
-        
-        # Track all reinforcements to apply at once
-        reinforcements = {}  # memory_id -> total_reinforcement
+        all_mems = self.search_index_map
         
+        sources = []
+        amounts = []
         for memory_id, relevance_score in recalled_memories:
-            if memory_id not in id_to_index:
+            memory_index = graph.index_of.get(memory_id)
+            if memory_index is None:
                 continue
-                
-            memory_index = id_to_index[memory_id]
             # Limit base reinforcement to between 0 and 1
             base_reinforcement = min(1.0, max(0.0, relevance_score))
-            
             print(f"   📈 Reinforcing '{all_mems[memory_index]['content'][:30]}...' (+{base_reinforcement:.2f})")
-            
-            # 1. Reinforce the recalled memory itself (100%)
-            if memory_id not in reinforcements:
-                reinforcements[memory_id] = 0
-            reinforcements[memory_id] += base_reinforcement
-            
-            # 2. Reinforce immediate neighbors (30%)
-            neighbor_reinforcement = base_reinforcement * 0.3
-            visited_neighbors = set()
-            
-            for neighbor_idx, similarity in connections[memory_index]:
-                neighbor_id = all_mems[neighbor_idx]['id']
-                if neighbor_id not in reinforcements:
-                    reinforcements[neighbor_id] = 0
-                reinforcements[neighbor_id] += neighbor_reinforcement
-                visited_neighbors.add(neighbor_idx)
-            
-            # 3. Reinforce neighbors of neighbors (9% = 30% of 30%)
-            second_degree_reinforcement = neighbor_reinforcement * 0.3
-            visited_second_degree = set()
-            
-            for neighbor_idx in visited_neighbors:
-                for second_neighbor_idx, similarity in connections[neighbor_idx]:
-                    if second_neighbor_idx != memory_index and second_neighbor_idx not in visited_neighbors:
-                        second_neighbor_id = all_mems[second_neighbor_idx]['id']
-                        if second_neighbor_id not in reinforcements:
-                            reinforcements[second_neighbor_id] = 0
-                        reinforcements[second_neighbor_id] += second_degree_reinforcement
-                        visited_second_degree.add(second_neighbor_idx)
-            
-            # 4. Reinforce third-degree neighbors (2.7% = 30% of 9%)
-            third_degree_reinforcement = second_degree_reinforcement * 0.3
-            
-            for second_neighbor_idx in visited_second_degree:
-                for third_neighbor_idx, similarity in connections[second_neighbor_idx]:
-                    if (third_neighbor_idx != memory_index and 
-                        third_neighbor_idx not in visited_neighbors and 
-                        third_neighbor_idx not in visited_second_degree):
-                        third_neighbor_id = all_mems[third_neighbor_idx]['id']
-                        if third_neighbor_id not in reinforcements:
-                            reinforcements[third_neighbor_id] = 0
-                        reinforcements[third_neighbor_id] += third_degree_reinforcement
+            sources.append(memory_index)
+            amounts.append(base_reinforcement)
         
-        # Apply all reinforcements
-        total_reinforced = 0
-        for memory in all_mems:
-            if memory['id'] in reinforcements:
-                old_score = memory.get('score', 0)
-                reinforcement = reinforcements[memory['id']]
-                memory['score'] = round(old_score + reinforcement, 2)
-                total_reinforced += 1
+        reinforcement, touched = propagate_reinforcement(
+            graph, sources, amounts, hops=self.reinforcement_hops, decay=self.reinforcement_decay)
         
-        print(f"   ✅ Applied reinforcements to {total_reinforced} memories")
+        # Apply all reinforcements
+        touched_rows = np.flatnonzero(touched).tolist()
+        for i in touched_rows:
+            memory = all_mems[i]
+            self._set_memory_score(memory, round(memory.get('score', 0) + float(reinforcement[i]), 2))
         
-        # Save the updated memories to persist reinforcement scores
-        self._save_memories()
+        print(f"   ✅ Applied reinforcements to {len(touched_rows)} memories")
         
-        # Rebuild search index with new scores
-        self._build_search_index()
+        # Log the changed scores to persist reinforcement.
+        # The index shares the memory dicts, so it already sees the new scores.
+        self._schedule_persist()
 
     def get_all_memories(self):
         """Get all memories as a flat list, sorted by score."""
         # Get all memories flat and sort by score (don't recalculate to preserve reinforcement)
-        all_memories = self._get_all_memories_flat()
-        sorted_memories = sorted(all_memories, key=lambda x: x.get('score', 0), reverse=True)
+        all_memories, scores = self._memories_with_scores()
+        sorted_memories = [all_memories[i] for i in np.argsort(-scores, kind='stable').tolist()]
         
-        # Update the in-memory structure but don't save (to avoid overwriting)
-        self.memories['memories'] = sorted_memories
-        return self.memories
+        # Return a sorted view; the stored order must stay aligned with the search index
+        return {**self.memories, 'memories': sorted_memories}
 
     def get_top_memories(self, limit=10):
-        all_memories = self._get_all_memories_flat()
-        return sorted(all_memories, key=lambda x: x.get('score', 0), reverse=True)[:limit]
+        all_memories, scores = self._memories_with_scores()
+        return [all_memories[i] for i in top_k_indices(scores, limit).tolist()]
 
     def get_memory_by_id(self, memory_id):
         for memory in self.memories['memories']:
@@ -513,11 +1042,12 @@ class MemoryManager:
                 return memory
         return None
 
+    @_synchronized
     def boost_memory(self, memory_id, boost_factor=1.2):
         for memory in self.memories['memories']:
             if memory['id'] == memory_id:
-                memory['score'] = memory.get('score', 0) * boost_factor
-                self._save_memories()
+                self._set_memory_score(memory, memory.get('score', 0) * boost_factor)
+                self._schedule_persist()
                 return memory
         return None
 
@@ -547,15 +1077,17 @@ class MemoryManager:
             }
         }
 
+    @_synchronized
     def delete_memory(self, memory_id):
         # Find and delete memory from flat list
         for i, memory in enumerate(self.memories['memories']):
             if memory['id'] == memory_id:
                 del self.memories['memories'][i]
-                self._save_memories()
-                self._build_search_index()
-                # Recalculate scores but preserve reinforcement for remaining memories
-                self._recalculate_scores_by_connections(preserve_reinforcement=True)
+                self._log_mutation({'op': 'delete', 'id': memory_id})
+                generation = self.search_index.generation
+                self._remove_from_search_index(memory_id)
+                # Rescore the former neighbours, preserving reinforcement
+                self._rescore_affected(self._remove_from_cached_graphs(memory_id, generation))
                 return True
         return False
     AVAILABLE_MODELS = [
@@ -569,18 +1101,53 @@ class MemoryManager:
             print(f"Loading model: {model_name}")
             self.st_model = SentenceTransformer(model_name)
             self.st_model_name = model_name
+            self.embedding_cache = self._create_embedding_cache(model_name)
             self._build_search_index()
             self._recalculate_scores_by_connections(sim_threshold=0.35)
 
+    def get_cache_stats(self):
+        """Hit/miss counters of the embedding cache, the query LRU cache and the graph cache."""
+        return {
+            'embedding_cache': self.embedding_cache.get_stats(),
+            'query_cache': self.query_cache.get_stats(),
+            'graph_cache': {
+                'hits': self.graph_cache_hits,
+                'misses': self.graph_cache_misses,
+                'thresholds': len(self._graph_cache),
+            },
+        }
+
     def get_available_models(self):
         return self.AVAILABLE_MODELS
 
     def get_current_model(self):
-        return getattr(self, 'st_model_name', 'all-mpnet-base-v2')
+        return self.st_model_name
+
+    @_synchronized
+    def get_score_updates(self, since=None, epoch=None):
+        """
+        Scores for live UI updates.
+
+        Args:
+            since: score generation the client saw last (None for every memory)
+            epoch: epoch that generation came with; a different one (e.g. from
+                   before a restart) gets every memory
+        Returns:
+            (memories, generation, epoch, full): the memories whose score changed
+            after `since` (all of them when full is True) and the generation and
+            epoch to send next time
+        """
+        index = self.search_index
+        changed = None if since is None else index.score_changes_since(since, epoch)
+        if changed is None:
+            return self._get_all_memories_flat(), index.score_generation, index.epoch, True
+        return changed, index.score_generation, index.epoch, False
 
     def _get_last_update_time(self):
         """Get the timestamp of the last score update"""
         try:
+            if self.store is not None:
+                return self.store.last_modified()
             if os.path.exists(self.db_path):
                 return os.path.getmtime(self.db_path)
             return 0
@@ -593,23 +1160,126 @@ class MemoryManager:
         This will overwrite any existing reinforcement scores.
         """
         print("🔄 Manually recalculating all scores from scratch...")
-        result = self._calculate_all_scores_and_connections(sim_threshold, preserve_reinforcement=False)
-        self._save_memories()
+        result = self._calculate_scores_and_graph(sim_threshold, preserve_reinforcement=False)
         print("✅ Score recalculation complete")
         return result
 
     def save_current_scores(self):
         """
-        Save current scores to JSON file to make them persistent.
+        Save current scores to storage to make them persistent.
         This preserves all current reinforcement and connection scores.
+        Writes a full snapshot right away, bypassing the write-behind delay.
         """
-        print("💾 Saving current scores to JSON...")
-        self._save_memories()
-        print("✅ Current scores saved to memories.json")
+        target = os.path.basename(self.store.db_path if self.store is not None else self.db_path)
+        print(f"💾 Saving current scores to {target}...")
+        self._schedule_persist(snapshot=True)
+        self.flush()
+        print(f"✅ Current scores saved to {target}")
         return True
 
+    def _apply_loaded_memories(self, data):
+        """
+        Replace self.memories with a freshly loaded document, diffing it against
+        the search index by memory id and content: rows of unchanged memories
+        are reused, only new or edited contents are encoded, and rows of
+        deleted memories are dropped.
+        """
+        new_memories = data.get('memories', [])
+        self.memories = data
+        self._compact_search_index()
+        index = self.search_index
+        if len(index) == 0 or not new_memories:
+            self._build_search_index()
+            return
+        
+        old_rows = np.full(len(new_memories), -1, dtype=np.int64)
+        for i, mem in enumerate(new_memories):
+            row = index.row_by_id.get(mem['id'])
+            if row is not None and index.memories[row]['content'] == mem['content']:
+                old_rows[i] = row
+        reused = old_rows >= 0
+        missing = np.flatnonzero(~reused)
+        
+        embeddings = np.empty((len(new_memories), index.dim), dtype=np.float32)
+        embeddings[reused] = index.vectors(old_rows[reused])
+        if len(missing):
+            embeddings[missing] = self._encode_texts([new_memories[i]['content'] for i in missing.tolist()])
+        
+        # The ANN index can keep its lists if surviving rows kept their relative
+        # order and everything new was appended after them
+        kept = old_rows[reused]
+        appended_only = bool(np.all(np.diff(kept) > 0)) and (len(missing) == 0 or missing[0] == len(kept))
+        old_to_new = np.full(index.size, -1, dtype=np.int64)
+        old_to_new[kept] = np.arange(len(kept))
+        
+        index.reset(new_memories, embeddings, copy=False)
+        if appended_only:
+            self.ann_index.remap(old_to_new)
+        else:
+            self.ann_index.reset()
+        print(f"[MemoryManager] ✅ Reloaded {len(new_memories)} memories from disk "
+              f"({len(missing)} encoded, {len(kept)} reused, {len(old_to_new) - len(kept)} dropped)")
+
+    def _apply_wal_tail(self, fingerprint):
+        """Apply write-ahead log records appended by other processes since the last load."""
+        _, records = self.wal.read(self._wal_offset)
+        self._wal_offset = self.wal.read_offset
+        self._disk_fingerprint = fingerprint
+        memories = self.memories['memories']
+        index = self.search_index
+        for record in records:
+            op = record.get('op')
+            if op == 'add':
+                memory = record['memory']
+                row = index.row_by_id.get(memory['id'])
+                if row is not None and index.memories[row]['content'] == memory['content']:
+                    index.memories[row].update(memory)
+                    index.set_score(memory['id'], memory.get('score', 0))
+                    continue
+                if row is not None:
+                    memories.remove(index.memories[row])
+                    self._remove_from_search_index(memory['id'])
+                memories.append(memory)
+                self._append_to_search_index(memory)
+            elif op == 'delete':
+                row = index.row_by_id.get(record['id'])
+                if row is not None:
+                    memories.remove(index.memories[row])
+                    self._remove_from_search_index(record['id'])
+            elif op == 'scores':
+                for memory_id, score in record['scores'].items():
+                    row = index.row_by_id.get(memory_id)
+                    if row is not None:
+                        index.memories[row]['score'] = score
+                        index.set_score(memory_id, score)
+        if records:
+            print(f"[MemoryManager] ✅ Applied {len(records)} new write-ahead log records from disk.")
+
+    @_synchronized
     def reload_from_disk(self):
-        """Reload memories and search index from disk with error handling."""
+        """
+        Reload memories and search index from disk with error handling.
+        Returns immediately when the storage fingerprint (mtime, size, generation)
+        is unchanged, and only replays the new log records when memories.json
+        itself is unchanged.
+        """
+        fingerprint = self._storage_fingerprint()
+        if fingerprint == self._disk_fingerprint:
+            return
+        if (self.store is None and self._disk_fingerprint is not None
+                and fingerprint[0] == self._disk_fingerprint[0]
+                and fingerprint[1] is not None and fingerprint[1][1] >= self._wal_offset):
+            self._apply_wal_tail(fingerprint)
+            return
+        
+        # Write pending score changes first so the full reload does not drop them
+        self._flush_pending()
+        fingerprint = self._storage_fingerprint()
+        if self.store is not None:
+            self._apply_loaded_memories(self.store.load())
+            self._disk_fingerprint = fingerprint
+            return
+            
         # Check for lock file first
         lock_path = self.db_path + '.lock'
         if os.path.exists(lock_path):
@@ -639,8 +1309,9 @@ class MemoryManager:
             max_retries = 3
             for attempt in range(max_retries):
                 try:
-                    # Small delay to ensure file write is complete
-                    time.sleep(0.05 * (attempt + 1))
+                    # Back off before retrying a read that failed mid-write
+                    if attempt > 0:
+                        time.sleep(0.05 * attempt)
                     
                     # Attempt to load the file
                     with open(self.db_path, 'r', encoding='utf-8') as f:
@@ -657,10 +1328,11 @@ class MemoryManager:
                             print("[MemoryManager] Warning: Invalid memories.json structure, skipping reload")
                             return
                         
-                        # Update memories and rebuild index
-                        self.memories = data
-                        self._build_search_index()
-                        print("[MemoryManager] ✅ Reloaded memories and rebuilt search index from disk.")
+                        # Replay the write-ahead log, then diff memories against the index
+                        self._apply_wal(data)
+                        self._apply_loaded_memories(data)
+                        self._disk_fingerprint = fingerprint
+                        self._wal_offset = self.wal.read_offset
                         return
                         
                 except (IOError, OSError) as io_error:
@@ -0,0 +1,80 @@
+import threading
+
+
+class ReinforcementQueue:
+    """
+    Background worker that batches memory reinforcement from many searches.
+
+    Searches enqueue their recalled (memory_id, relevance) pairs and return
+    immediately. The worker drains everything pending every `flush_interval`
+    seconds, or as soon as `max_batch_size` searches have queued up. Each
+    search is still applied with its own call to `apply_fn`, in arrival
+    order, so scores end up exactly as if every search had been reinforced
+    before it returned.
+    """
+
+    def __init__(self, apply_fn, flush_interval=2.0, max_batch_size=32):
+        self.apply_fn = apply_fn
+        self.flush_interval = flush_interval
+        self.max_batch_size = max_batch_size
+        self._pending = []          # one list of recalled pairs per search
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopped = False
+        self._thread = None
+        self.batches_applied = 0
+
+    def _ensure_worker(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stopped = False
+            self._thread = threading.Thread(target=self._run, name='reinforcement-worker', daemon=True)
+            self._thread.start()
+
+    def enqueue(self, recalled_memories):
+        if not recalled_memories:
+            return
+        with self._lock:
+            self._pending.append(list(recalled_memories))
+            full = len(self._pending) >= self.max_batch_size
+            self._ensure_worker()
+        if full:
+            self._wake.set()
+
+    def pending_count(self):
+        with self._lock:
+            return len(self._pending)
+
+    def flush(self):
+        """Apply everything queued so far, one reinforcement pass per search."""
+        with self._flush_lock:
+            with self._lock:
+                batch, self._pending = self._pending, []
+            if not batch:
+                return 0
+            failed = 0
+            for recalled in batch:
+                try:
+                    self.apply_fn(recalled)
+                except Exception as e:
+                    failed += 1
+                    print(f"[ReinforcementQueue] ❌ Failed to apply a queued reinforcement: {e}")
+            if failed < len(batch):
+                self.batches_applied += 1
+            return len(batch)
+
+    def _run(self):
+        while not self._stopped:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            self.flush()
+
+    def stop(self, flush=True):
+        """Stop the worker, applying pending reinforcements first by default."""
+        self._stopped = True
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=max(1.0, self.flush_interval * 2))
+            self._thread = None
+        if flush:
+            self.flush()
@@ -0,0 +1,328 @@
+import uuid
+from collections import OrderedDict
+import numpy as np
+
+
+def top_k_indices(values, k):
+    """Indices of the k largest values, largest first (ties keep input order)."""
+    n = len(values)
+    if k <= 0 or n == 0:
+        return np.zeros(0, dtype=np.int64)
+    if k < n:
+        # argpartition picks an arbitrary subset of the values tied with the
+        # k-th largest; widen to all of them so the stable sort decides
+        kth_value = values[np.argpartition(-values, k - 1)[k - 1]]
+        candidates = np.flatnonzero(values >= kth_value)
+    else:
+        candidates = np.arange(n)
+    return candidates[np.lexsort((candidates, -values[candidates]))][:k]
+
+
+def normalize_rows(embeddings, copy=True):
+    """
+    L2-normalize the rows of a float32 matrix (zero rows stay zero).
+    With copy=False the matrix is normalized in place, and left untouched when
+    every row already has unit length.
+    """
+    embeddings = np.asarray(embeddings, dtype=np.float32)
+    norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+    if not copy and np.allclose(norms, 1.0, atol=1e-5):
+        return embeddings
+    if copy or not embeddings.flags.writeable:
+        embeddings = embeddings.copy()
+    np.divide(embeddings, np.maximum(norms, 1e-12), out=embeddings)
+    return embeddings
+
+
+class SearchIndex:
+    """
+    Incrementally maintained embedding index for semantic search.
+
+    Rows live in an over-allocated buffer so appends are amortized O(1).
+    Deletes only tombstone a row; `compact()` squeezes the tombstones out
+    while keeping the relative order of the remaining rows. A float64 score
+    column mirrors each memory's 'score' for vectorized ranking.
+
+    Rows are stored L2-normalized, so a dot product with a normalized query
+    (or another row) is the cosine similarity.
+
+    precision selects the row storage:
+        float32: exact (4 bytes per dimension)
+        float16: half precision (2 bytes per dimension)
+        int8: scalar-quantized codes plus a float32 scale per row (1 byte per dimension)
+    Reduced-precision similarities are approximate; callers re-rank the top
+    candidates against full-precision vectors.
+
+    `generation` increases whenever the sequence of live rows changes (append,
+    remove, reset). Compaction keeps that sequence and score changes are not
+    part of it, so anything derived from the contents and embeddings alone
+    (such as the similarity graph, indexed by live row position) can be cached
+    against it.
+
+    `score_generation` increases with every score change, and the ids whose
+    score changed are kept in change order, so `score_changes_since()` can
+    hand out only the memories changed after a generation a client saw.
+    Generations restart with every index, so they are only meaningful
+    together with the index's random `epoch`.
+    """
+
+    PRECISIONS = ('float32', 'float16', 'int8')
+    DOT_BLOCK_SIZE = 8192
+
+    def __init__(self, initial_capacity=64, precision='float32'):
+        if precision not in self.PRECISIONS:
+            raise ValueError(f"Unknown index precision '{precision}', expected one of {list(self.PRECISIONS)}")
+        self.initial_capacity = initial_capacity
+        self.precision = precision
+        self.generation = 0
+        self.score_generation = 0
+        self.epoch = uuid.uuid4().hex[:12]
+        self.clear()
+
+    def clear(self):
+        self.generation += 1
+        # Every score may have changed: changes up to here are not tracked per memory
+        self.score_generation += 1
+        self._score_floor = self.score_generation
+        self._score_versions = OrderedDict()  # memory id -> generation of its last score change
+        self._vectors = None
+        self._row_scales = np.zeros(0, dtype=np.float32)  # int8 dequantization factors
+        self._alive = np.zeros(0, dtype=bool)
+        self._scores = np.zeros(0, dtype=np.float64)
+        self.memories = []      # row -> memory dict (None once tombstoned)
+        self.row_by_id = {}     # memory id -> row
+        self.size = 0           # rows in use, including tombstones
+        self.tombstones = 0
+
+    def __len__(self):
+        """Number of live (non-tombstoned) rows."""
+        return self.size - self.tombstones
+
+    @property
+    def dim(self):
+        return None if self._vectors is None else self._vectors.shape[1]
+
+    @property
+    def exact(self):
+        return self.precision == 'float32'
+
+    @property
+    def nbytes(self):
+        """Bytes held by the row buffer (including spare capacity)."""
+        if self._vectors is None:
+            return 0
+        return self._vectors.nbytes + self._row_scales.nbytes
+
+    def _quantize(self, embeddings):
+        """Store-format codes (and int8 row scales) for normalized float32 rows."""
+        if self.precision == 'int8':
+            scales = np.maximum(np.abs(embeddings).max(axis=1), 1e-12) / 127.0
+            codes = np.rint(embeddings / scales[:, None]).astype(np.int8)
+            return codes, scales.astype(np.float32)
+        return embeddings.astype(self.precision, copy=False), None
+
+    def vectors(self, rows=None):
+        """float32 rows (all used rows if rows is None), dequantized if needed."""
+        if self._vectors is None:
+            return None
+        stored = self._vectors[:self.size] if rows is None else self._vectors[rows]
+        if self.exact:
+            return stored
+        vectors = stored.astype(np.float32)
+        if self.precision == 'int8':
+            scales = self._row_scales[:self.size] if rows is None else self._row_scales[rows]
+            vectors *= scales[:, None]
+        return vectors
+
+    @property
+    def embeddings(self):
+        """
+        All used rows as float32, including tombstoned ones (mask with `alive`).
+        A view for float32 storage, a dequantized copy otherwise.
+        """
+        return self.vectors()
+
+    def dot(self, query, rows=None):
+        """Similarities of a normalized float32 query with the given rows (default: all used rows)."""
+        if self.exact:
+            stored = self._vectors[:self.size] if rows is None else self._vectors[rows]
+            return stored @ query
+        n = self.size if rows is None else len(rows)
+        similarities = np.empty(n, dtype=np.float32)
+        # Dequantize one block at a time instead of materializing a float32 matrix
+        for start in range(0, n, self.DOT_BLOCK_SIZE):
+            stop = min(start + self.DOT_BLOCK_SIZE, n)
+            block_rows = slice(start, stop) if rows is None else rows[start:stop]
+            similarities[start:stop] = self.vectors(block_rows) @ query
+        return similarities
+
+    @property
+    def alive(self):
+        return self._alive[:self.size]
+
+    @property
+    def scores(self):
+        """Score column (0 for tombstoned rows)."""
+        return self._scores[:self.size]
+
+    def set_score(self, memory_id, score):
+        row = self.row_by_id.get(memory_id)
+        if row is not None and self._scores[row] != score:
+            self._scores[row] = score
+            self._touch_scores([memory_id])
+
+    def refresh_scores(self):
+        """
+        Re-read the score column from the memory dicts after bulk score changes.
+        Returns the rows whose score changed.
+        """
+        scores = np.fromiter((0.0 if mem is None else mem.get('score', 0) for mem in self.memories),
+                             dtype=np.float64, count=self.size)
+        changed = np.flatnonzero(scores != self._scores[:self.size])
+        self._scores[:self.size] = scores
+        self._touch_scores([self.memories[row]['id'] for row in changed.tolist()])
+        return changed
+
+    def _touch_scores(self, memory_ids):
+        if not memory_ids:
+            return
+        self.score_generation += 1
+        for memory_id in memory_ids:
+            self._score_versions[memory_id] = self.score_generation
+            self._score_versions.move_to_end(memory_id)
+
+    def score_changes_since(self, score_generation, epoch):
+        """
+        Memories whose score changed (or that were added) after score_generation,
+        most recent first, or None if that generation is older than the tracked
+        changes, or comes from another epoch (e.g. an earlier server process),
+        and the caller needs every memory.
+        """
+        if epoch != self.epoch:
+            return None
+        if score_generation < self._score_floor or score_generation > self.score_generation:
+            return None
+        changed = []
+        for memory_id, version in reversed(self._score_versions.items()):
+            if version <= score_generation:
+                break
+            changed.append(self.memories[self.row_by_id[memory_id]])
+        return changed
+
+    def reset(self, memories, embeddings, copy=True):
+        """
+        Replace the whole index with memories and their embedding rows.
+        With copy=False a writable float32 matrix (e.g. a copy-on-write memory
+        map) becomes the row buffer as-is; it is copied on the first append.
+        """
+        self.clear()
+        if not memories:
+            return
+        embeddings = normalize_rows(embeddings, copy=copy)
+        capacity = max(self.initial_capacity, len(memories))
+        if not self.exact:
+            codes, scales = self._quantize(embeddings)
+            self._vectors = np.empty((capacity, embeddings.shape[1]), dtype=codes.dtype)
+            self._vectors[:len(memories)] = codes
+            self._row_scales = np.zeros(capacity, dtype=np.float32)
+            if scales is not None:
+                self._row_scales[:len(memories)] = scales
+        elif copy:
+            self._vectors = np.empty((capacity, embeddings.shape[1]), dtype=np.float32)
+            self._vectors[:len(memories)] = embeddings
+        else:
+            capacity = len(memories)
+            self._vectors = embeddings
+        self._alive = np.zeros(capacity, dtype=bool)
+        self._alive[:len(memories)] = True
+        self._scores = np.zeros(capacity, dtype=np.float64)
+        self._scores[:len(memories)] = [mem.get('score', 0) for mem in memories]
+        self.memories = list(memories)
+        self.row_by_id = {mem['id']: i for i, mem in enumerate(memories)}
+        self.size = len(memories)
+
+    def _ensure_capacity(self, needed, dim):
+        if self._vectors is None:
+            capacity = max(self.initial_capacity, needed)
+            self._vectors = np.empty((capacity, dim), dtype=self.precision)
+            self._row_scales = np.zeros(capacity, dtype=np.float32)
+            self._alive = np.zeros(capacity, dtype=bool)
+            self._scores = np.zeros(capacity, dtype=np.float64)
+            return
+        capacity = self._vectors.shape[0]
+        if needed <= capacity:
+            return
+        while capacity < needed:
+            capacity *= 2
+        vectors = np.empty((capacity, self._vectors.shape[1]), dtype=self._vectors.dtype)
+        vectors[:self.size] = self._vectors[:self.size]
+        row_scales = np.zeros(capacity, dtype=np.float32)
+        row_scales[:len(self._row_scales)] = self._row_scales
+        alive = np.zeros(capacity, dtype=bool)
+        alive[:self.size] = self._alive[:self.size]
+        scores = np.zeros(capacity, dtype=np.float64)
+        scores[:self.size] = self._scores[:self.size]
+        self._vectors = vectors
+        self._row_scales = row_scales
+        self._alive = alive
+        self._scores = scores
+
+    def append(self, memory, embedding):
+        """Append one memory row and return its row number."""
+        if memory['id'] in self.row_by_id:
+            self.remove(memory['id'])
+        codes, scales = self._quantize(normalize_rows(np.reshape(embedding, (1, -1))))
+        self._ensure_capacity(self.size + 1, codes.shape[1])
+        row = self.size
+        self._vectors[row] = codes[0]
+        if scales is not None:
+            self._row_scales[row] = scales[0]
+        self._alive[row] = True
+        self._scores[row] = memory.get('score', 0)
+        self.memories.append(memory)
+        self.row_by_id[memory['id']] = row
+        self.size += 1
+        self.generation += 1
+        self._touch_scores([memory['id']])
+        return row
+
+    def remove(self, memory_id):
+        """Tombstone the row of memory_id. Returns False if it is not indexed."""
+        row = self.row_by_id.pop(memory_id, None)
+        if row is None:
+            return False
+        self._alive[row] = False
+        self._scores[row] = 0.0
+        self._score_versions.pop(memory_id, None)
+        self.memories[row] = None
+        self.tombstones += 1
+        self.generation += 1
+        return True
+
+    def needs_compaction(self, max_tombstone_ratio=0.25):
+        return self.size > 0 and self.tombstones / self.size > max_tombstone_ratio
+
+    def compact(self):
+        """
+        Drop tombstoned rows in place.
+
+        Returns an array mapping old row numbers to new ones (-1 for dropped
+        rows), or None if there was nothing to compact.
+        """
+        if self.tombstones == 0:
+            return None
+        live_rows = np.flatnonzero(self._alive[:self.size])
+        old_to_new = np.full(self.size, -1, dtype=np.int64)
+        old_to_new[live_rows] = np.arange(len(live_rows))
+
+        self._vectors[:len(live_rows)] = self._vectors[live_rows]
+        if len(self._row_scales):
+            self._row_scales[:len(live_rows)] = self._row_scales[live_rows]
+        self._scores[:len(live_rows)] = self._scores[live_rows]
+        self._alive[:self.size] = False
+        self._alive[:len(live_rows)] = True
+        self.memories = [self.memories[i] for i in live_rows]
+        self.row_by_id = {mem['id']: i for i, mem in enumerate(self.memories)}
+        self.size = len(live_rows)
+        self.tombstones = 0
+        return old_to_new
@@ -0,0 +1,198 @@
+import json
+import os
+import sqlite3
+import threading
+import uuid
+import numpy as np
+from embedding_cache import EmbeddingCache
+
+CORE_FIELDS = ('id', 'content', 'score', 'tags', 'created')
+
+
+class SQLiteMemoryStore:
+    """
+    SQLite storage backend for MemoryManager.
+
+    The database runs in WAL mode so several processes can read while one
+    writes, without the .lock file dance of the JSON backend. Memories keep
+    their insertion order through the `position` column, scores are indexed,
+    and score changes are single-row UPDATEs. Every mutating transaction bumps
+    a generation counter in the `meta` table.
+    """
+
+    SYNCHRONOUS = {'always': 'FULL', 'interval': 'NORMAL', 'never': 'OFF'}
+
+    def __init__(self, db_path, fsync='interval'):
+        self.db_path = db_path
+        os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        self._lock = threading.RLock()
+        self.conn = sqlite3.connect(db_path, check_same_thread=False, timeout=30)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        # In WAL mode NORMAL only syncs at checkpoints, the closest match to 'interval'
+        self.conn.execute(f'PRAGMA synchronous={self.SYNCHRONOUS[fsync]}')
+        self._create_schema()
+
+    def _create_schema(self):
+        with self._lock, self.conn:
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS memories (
+                    id TEXT PRIMARY KEY,
+                    position INTEGER NOT NULL,
+                    content TEXT NOT NULL,
+                    score REAL NOT NULL DEFAULT 0,
+                    tags TEXT NOT NULL DEFAULT '[]',
+                    created TEXT,
+                    extra TEXT
+                )""")
+            self.conn.execute('CREATE INDEX IF NOT EXISTS idx_memories_score ON memories(score)')
+            self.conn.execute('CREATE INDEX IF NOT EXISTS idx_memories_position ON memories(position)')
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS embeddings (
+                    key BLOB PRIMARY KEY,
+                    model TEXT NOT NULL,
+                    vector BLOB NOT NULL
+                )""")
+            self.conn.execute('CREATE INDEX IF NOT EXISTS idx_embeddings_model ON embeddings(model)')
+            self.conn.execute('CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)')
+            self.conn.execute("INSERT OR IGNORE INTO meta VALUES ('instance', ?)", (uuid.uuid4().hex,))
+            self.conn.execute("INSERT OR IGNORE INTO meta VALUES ('generation', '0')")
+            # Databases from before the 'migrated' flag already hold their imported memories
+            if self.conn.execute('SELECT 1 FROM memories LIMIT 1').fetchone():
+                self.conn.execute("INSERT OR IGNORE INTO meta VALUES ('migrated', '1')")
+
+    def _bump_generation(self):
+        self.conn.execute("UPDATE meta SET value = CAST(value AS INTEGER) + 1 WHERE key = 'generation'")
+
+    def generation(self):
+        """(database instance id, mutation counter) - changes whenever the memories do."""
+        with self._lock:
+            rows = dict(self.conn.execute("SELECT key, value FROM meta").fetchall())
+        return rows['instance'], int(rows['generation'])
+
+    @staticmethod
+    def _to_row(memory, position):
+        extra = {k: v for k, v in memory.items() if k not in CORE_FIELDS}
+        return (memory['id'], position, memory['content'], float(memory.get('score', 0)),
+                json.dumps(memory.get('tags', []), ensure_ascii=False), memory.get('created'),
+                json.dumps(extra, ensure_ascii=False) if extra else None)
+
+    @staticmethod
+    def _from_row(row):
+        memory_id, content, score, tags, created, extra = row
+        memory = {'id': memory_id, 'content': content, 'score': score,
+                  'tags': json.loads(tags), 'created': created}
+        if extra:
+            memory.update(json.loads(extra))
+        return memory
+
+    def count(self):
+        with self._lock:
+            return self.conn.execute('SELECT COUNT(*) FROM memories').fetchone()[0]
+
+    def load(self):
+        """Return all memories as a {'memories': [...]} document in insertion order."""
+        with self._lock:
+            rows = self.conn.execute(
+                'SELECT id, content, score, tags, created, extra FROM memories ORDER BY position').fetchall()
+        return {'memories': [self._from_row(row) for row in rows]}
+
+    def insert(self, memory):
+        with self._lock, self.conn:
+            position = self.conn.execute('SELECT COALESCE(MAX(position), -1) + 1 FROM memories').fetchone()[0]
+            self.conn.execute('INSERT OR REPLACE INTO memories VALUES (?, ?, ?, ?, ?, ?, ?)',
+                              self._to_row(memory, position))
+            self._bump_generation()
+
+    def delete(self, memory_id):
+        with self._lock, self.conn:
+            self.conn.execute('DELETE FROM memories WHERE id = ?', (memory_id,))
+            self._bump_generation()
+
+    def update_scores(self, scores):
+        """Point updates for {memory_id: score}."""
+        with self._lock, self.conn:
+            self.conn.executemany('UPDATE memories SET score = ? WHERE id = ?',
+                                  [(float(score), memory_id) for memory_id, score in scores.items()])
+            self._bump_generation()
+
+    def replace_all(self, memories):
+        """Replace every memory in one transaction."""
+        with self._lock, self.conn:
+            self.conn.execute('DELETE FROM memories')
+            self.conn.executemany('INSERT INTO memories VALUES (?, ?, ?, ?, ?, ?, ?)',
+                                  [self._to_row(mem, i) for i, mem in enumerate(memories)])
+            self._bump_generation()
+
+    def apply(self, record):
+        """Apply a mutation record in the write-ahead log format."""
+        op = record.get('op')
+        if op == 'add':
+            self.insert(record['memory'])
+        elif op == 'delete':
+            self.delete(record['id'])
+        elif op == 'scores':
+            self.update_scores(record['scores'])
+
+    def last_modified(self):
+        """Modification time of the database or its WAL file, whichever is newer."""
+        times = [os.path.getmtime(path) for path in (self.db_path, self.db_path + '-wal')
+                 if os.path.exists(path)]
+        return max(times) if times else 0
+
+    def needs_migration(self):
+        """True until memories.json has been imported (or found empty) once."""
+        with self._lock:
+            return self.conn.execute("SELECT 1 FROM meta WHERE key = 'migrated'").fetchone() is None
+
+    def migrate_from_json(self, data):
+        """
+        Import a loaded memories.json document, once. The 'migrated' meta key is
+        set in the same transaction, so a database emptied later on is not
+        filled from memories.json again.
+        """
+        if not self.needs_migration():
+            return 0
+        memories = data.get('memories', [])
+        with self._lock, self.conn:
+            self.conn.execute('DELETE FROM memories')
+            self.conn.executemany('INSERT INTO memories VALUES (?, ?, ?, ?, ?, ?, ?)',
+                                  [self._to_row(mem, i) for i, mem in enumerate(memories)])
+            self.conn.execute("INSERT OR REPLACE INTO meta VALUES ('migrated', '1')")
+            self._bump_generation()
+        if memories:
+            print(f"[SQLiteMemoryStore] Migrated {len(memories)} memories from JSON")
+        return len(memories)
+
+    def close(self):
+        with self._lock:
+            self.conn.close()
+
+
+class SQLiteEmbeddingCache(EmbeddingCache):
+    """
+    EmbeddingCache persisted as BLOBs in the SQLite store's embeddings table.
+    Vectors are kept in memory rather than memory-mapped.
+    """
+
+    def __init__(self, store, model_name):
+        self.store = store
+        super().__init__(os.path.dirname(store.db_path), model_name)
+
+    def _load(self):
+        with self.store._lock:
+            rows = self.store.conn.execute(
+                'SELECT key, vector FROM embeddings WHERE model = ?', (self.model_name,)).fetchall()
+        for key, vector in rows:
+            self._vectors[bytes(key)] = np.frombuffer(vector, dtype='<f4')
+        if rows:
+            self.dim = len(self._vectors[bytes(rows[0][0])])
+            print(f"[EmbeddingCache] Loaded {len(rows)} cached embeddings for {self.model_name}")
+
+    def _append(self, keys, vectors):
+        for key, vec in zip(keys, vectors):
+            self._vectors[key] = vec
+        with self.store._lock, self.store.conn:
+            self.store.conn.executemany(
+                'INSERT OR IGNORE INTO embeddings VALUES (?, ?, ?)',
+                [(key, self.model_name, np.asarray(vec, dtype='<f4').tobytes())
+                 for key, vec in zip(keys, vectors)])
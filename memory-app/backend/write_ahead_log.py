@@ -0,0 +1,151 @@
+import json
+import os
+import threading
+import time
+
+
+class WriteAheadLog:
+    """
+    Append-only JSON-lines log of memory mutations made since the last snapshot.
+
+    The first line is a header naming the snapshot generation the log applies
+    to; each following line is one record:
+        {"op": "add", "memory": {...}}
+        {"op": "delete", "id": "..."}
+        {"op": "scores", "scores": {"<id>": <new score>, ...}}
+    Score records carry the new values of the changed memories rather than
+    increments, so replaying a record twice is harmless.
+
+    fsync policy: 'always' syncs every write, 'interval' at most once per
+    `fsync_interval` seconds (plus on `sync()`), 'never' leaves it to the OS.
+    """
+
+    FSYNC_POLICIES = ('always', 'interval', 'never')
+
+    def __init__(self, path, fsync='always', fsync_interval=1.0):
+        if fsync not in self.FSYNC_POLICIES:
+            raise ValueError(f"Unknown fsync policy '{fsync}', expected one of {list(self.FSYNC_POLICIES)}")
+        self.path = path
+        self.fsync = fsync
+        self.fsync_interval = fsync_interval
+        self.record_count = 0
+        self.read_offset = 0
+        self._last_sync = 0.0
+        self._unsynced = False
+        self._lock = threading.Lock()
+
+    def read(self, offset=0):
+        """
+        Return (generation, records) from byte `offset` on. Only complete lines
+        count, so a torn or still-being-written trailing line is left for later;
+        `read_offset` is set to the end of the last record read.
+        """
+        if not os.path.exists(self.path):
+            self.record_count = 0
+            self.read_offset = 0
+            return None, []
+        start = offset
+        generation = None
+        records = []
+        with open(self.path, 'rb') as f:
+            f.seek(offset)
+            for raw in f:
+                if not raw.endswith(b'\n'):
+                    break
+                line = raw.strip()
+                if line:
+                    try:
+                        record = json.loads(line)
+                    except (json.JSONDecodeError, UnicodeDecodeError):
+                        print(f"[WriteAheadLog] Ignoring unreadable record at byte {offset}")
+                        break
+                    if record.get('op') == 'header':
+                        generation = record.get('generation')
+                    else:
+                        records.append(record)
+                offset += len(raw)
+        self.record_count = len(records) if start == 0 else self.record_count + len(records)
+        self.read_offset = offset
+        return generation, records
+
+    def _write(self, f, lines):
+        f.write(''.join(json.dumps(line, ensure_ascii=False) + '\n' for line in lines))
+        f.flush()
+        now = time.monotonic()
+        if self.fsync == 'always' or (self.fsync == 'interval' and now - self._last_sync >= self.fsync_interval):
+            os.fsync(f.fileno())
+            self._last_sync = now
+            self._unsynced = False
+        else:
+            self._unsynced = self.fsync == 'interval'
+
+    def sync(self):
+        """fsync writes the 'interval' policy has not synced yet."""
+        with self._lock:
+            if not self._unsynced or not os.path.exists(self.path):
+                return
+            with open(self.path, 'a', encoding='utf-8') as f:
+                os.fsync(f.fileno())
+            self._last_sync = time.monotonic()
+            self._unsynced = False
+
+    def append(self, record, generation):
+        """Append one record, writing the header first if the log is new."""
+        with self._lock:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            new_log = not os.path.exists(self.path) or os.path.getsize(self.path) == 0
+            with open(self.path, 'a', encoding='utf-8') as f:
+                lines = [{'op': 'header', 'generation': generation}] if new_log else []
+                self._write(f, lines + [record])
+            self.record_count += 1
+
+    def reset(self, generation):
+        """Truncate the log after a snapshot and start it for the new generation."""
+        with self._lock:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            with open(self.path, 'w', encoding='utf-8') as f:
+                self._write(f, [{'op': 'header', 'generation': generation}])
+            self.record_count = 0
+
+
+def apply_wal_records(data, records):
+    """Replay log records onto a loaded {'memories': [...]} document in place."""
+    memories = data.setdefault('memories', [])
+    position = {mem['id']: i for i, mem in enumerate(memories)}
+    for record in records:
+        op = record.get('op')
+        if op == 'add':
+            memory = record['memory']
+            if memory['id'] in position:
+                memories[position[memory['id']]] = memory
+            else:
+                position[memory['id']] = len(memories)
+                memories.append(memory)
+        elif op == 'delete':
+            i = position.pop(record['id'], None)
+            if i is not None:
+                memories[i] = None
+        elif op == 'scores':
+            for memory_id, score in record['scores'].items():
+                i = position.get(memory_id)
+                if i is not None:
+                    memories[i]['score'] = score
+    data['memories'] = [mem for mem in memories if mem is not None]
+    return data
+
+
+def load_json_with_wal(json_path):
+    """
+    Read a memories.json document with its write-ahead log replayed, for tools
+    that read the file without a MemoryManager. A log left over from an older
+    snapshot is ignored, as MemoryManager does; the files are not modified.
+    """
+    with open(json_path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    if not isinstance(data, dict):
+        return data
+    generation = data.pop('wal_generation', None)
+    log_generation, records = WriteAheadLog(json_path + '.wal').read()
+    if records and log_generation == generation:
+        apply_wal_records(data, records)
+    return data
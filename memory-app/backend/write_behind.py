@@ -0,0 +1,76 @@
+import threading
+import time
+
+
+class WriteBehind:
+    """
+    Coalesces persistence requests into at most one flush per `interval` seconds.
+
+    `schedule()` only marks the owner dirty. A worker thread calls `flush_fn`
+    right away if the previous flush is older than `interval`, otherwise once
+    the interval has passed, so a burst of mutations costs a single write.
+    """
+
+    def __init__(self, flush_fn, interval=0.25):
+        self.flush_fn = flush_fn
+        self.interval = interval
+        self._pending = False
+        self._last_flush = 0.0
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+        self.flushes = 0
+
+    def _ensure_worker(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name='write-behind', daemon=True)
+            self._thread.start()
+
+    def schedule(self):
+        with self._lock:
+            self._pending = True
+            self._ensure_worker()
+        self._wake.set()
+
+    def pending(self):
+        with self._lock:
+            return self._pending
+
+    def flush(self, force=False):
+        """Run flush_fn now if anything is pending (or always with force=True)."""
+        with self._flush_lock:
+            with self._lock:
+                if not self._pending and not force:
+                    return False
+                self._pending = False
+            try:
+                self.flush_fn()
+                self.flushes += 1
+            except Exception as e:
+                print(f"[WriteBehind] ❌ Flush failed: {e}")
+            self._last_flush = time.monotonic()
+            return True
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._wake.wait()
+            self._wake.clear()
+            if self._stop.is_set():
+                return
+            delay = self._last_flush + self.interval - time.monotonic()
+            if delay > 0 and self._stop.wait(delay):
+                return
+            self.flush()
+
+    def stop(self, flush=True):
+        """Stop the worker, flushing anything pending first by default."""
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=max(1.0, self.interval * 2))
+            self._thread = None
+        if flush:
+            self.flush()
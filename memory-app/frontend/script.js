@@ -7,7 +7,7 @@ let isMapMode = false;
 // Session memory store for real-time updates
 let sessionMemories = [];
 let sessionMemoryIds = new Set();
-let newMemoryPollingInterval = null;
+let newMemoryEventSource = null;
 let savedNodePositions = {};
 
 let suppressMemoryNotifications = false;
@@ -710,42 +710,29 @@ function showNewMemoryNotification(memoryText) {
     }, 3000);
 }
 
-// Polling system for new memories
-function startNewMemoryPolling() {
-    if (newMemoryPollingInterval) {
-        clearInterval(newMemoryPollingInterval);
+function startNewMemoryStream() {
+    if (newMemoryEventSource) {
+        newMemoryEventSource.close();
     }
     
-    newMemoryPollingInterval = setInterval(checkForNewMemories, 2000);
-    console.log('📡 Started polling for new memories');
-}
-
-function stopNewMemoryPolling() {
-    if (newMemoryPollingInterval) {
-        clearInterval(newMemoryPollingInterval);
-        newMemoryPollingInterval = null;
-        console.log('⏸️ Stopped polling for new memories');
-    }
-}
-
-async function checkForNewMemories() {
-    try {
-        const data = await apiCall('/new-memories');
-        
-        if (data && data.memories && data.memories.length > 0) {
-            console.log(`🔔 Found ${data.memories.length} new memories!`);
-            
-            // Add each new memory to the session
-            for (const memoryData of data.memories) {
-                await addMemoryToSession(memoryData);
-            }
-        }
-    } catch (error) {
-        // Silently handle errors to avoid spamming console
-        if (error.message && !error.message.includes('fetch')) {
-            console.warn('Error checking for new memories:', error);
+    newMemoryEventSource = new EventSource(`${API_BASE_URL}/memory-events`);
+    newMemoryEventSource.addEventListener('memory', async (event) => {
+        const memoryData = JSON.parse(event.data);
+        console.log('🔔 New memory event:', memoryData.id);
+        await addMemoryToSession(memoryData);
+    });
+    newMemoryEventSource.addEventListener('resync', async () => {
+        console.log('🔄 Missed memory events, reloading memories');
+        if (isMapMode && network) {
+            await renderMemoryNetwork();
+        } else {
+            await renderMemories();
         }
-    }
+    });
+    newMemoryEventSource.onerror = () => {
+        console.warn('⚠️ Memory event stream interrupted, reconnecting...');
+    };
+    console.log('📡 Subscribed to new memory events');
 }
 
 // --- API Call Helper ---
@@ -775,6 +762,9 @@ document.addEventListener('DOMContentLoaded', () => {
     // Initialize memories list with the working approach
     renderMemories();
     
+    // Receive memories added elsewhere (e.g. extracted from a chat) as they are stored
+    startNewMemoryStream();
+    
     // Setup other features
     setupSearch();
     setupSettings();
@@ -9,6 +9,7 @@ import sys
 import time
 sys.path.append('memory-app/backend')
 from cloud_memory_manager import CloudMemoryManager
+from write_ahead_log import load_json_with_wal
 
 def print_banner():
     """Print migration banner."""
@@ -122,8 +123,8 @@ def preview_migration(json_file_path):
     print("-" * 50)
     
     try:
-        with open(json_file_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+        # Recent changes may still be only in the write-ahead log (memories.json.wal)
+        data = load_json_with_wal(json_file_path)
         
         if isinstance(data, list):
             memories = data
@@ -183,12 +184,14 @@ def perform_migration(json_file_path):
         return False
 
 def backup_json_file(json_file_path):
-    """Create a backup of the JSON file."""
+    """Create a backup of the JSON file (and its write-ahead log, if any)."""
     backup_path = f"{json_file_path}.backup.{int(time.time())}"
     
     try:
         import shutil
         shutil.copy2(json_file_path, backup_path)
+        if os.path.exists(json_file_path + '.wal'):
+            shutil.copy2(json_file_path + '.wal', backup_path + '.wal')
         print(f"💾 Backup created: {backup_path}")
         return backup_path
     except Exception as e:
@@ -7,6 +7,8 @@ import os
 import sys
 import subprocess
 import time
+import urllib.request
+import urllib.error
 import webbrowser
 from pathlib import Path
 import threading
@@ -57,6 +59,23 @@ def start_frontend():
     finally:
         os.chdir(original_dir)
 
+def wait_for_backend(url="http://localhost:5001/health", timeout=120):
+    """Poll the backend health endpoint until it reports ready (HTTP 200)."""
+    print("⏳ Waiting for backend to become ready...")
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            with urllib.request.urlopen(url, timeout=2) as response:
+                if response.status == 200:
+                    print("✅ Backend is ready!")
+                    return True
+        except (urllib.error.URLError, OSError):
+            # Not listening yet, or 5xx while the model is still loading
+            pass
+        time.sleep(0.5)
+    print(f"⚠️  Backend not ready after {timeout}s, continuing anyway")
+    return False
+
 def test_connection():
     """Test the database connection."""
     print("🔍 Testing database connection...")
@@ -100,8 +119,8 @@ def main():
     backend_thread = threading.Thread(target=start_backend, daemon=True)
     backend_thread.start()
     
-    # Give backend time to start
-    time.sleep(3)
+    # Only open the UI once the backend has loaded its model and answers /health
+    wait_for_backend()
     
     # Open browser
     try:
@@ -176,11 +176,8 @@ class ConversationService:
                             }
                             print(f"🔧 DEBUG: Memory data prepared: {memory_data}")
                             
-                            with config.session_new_memories_lock:
-                                config.session_new_memories.append(memory_data)
-                                print(f"🔧 DEBUG: Session queue size after add: {len(config.session_new_memories)}")
-                            
-                            print(f"🌐 Queued new memory for network: {memory_data['id']}")
+                            event_id = config.new_memory_events.publish(memory_data)
+                            print(f"🌐 Published new memory for network: {memory_data['id']} (event {event_id})")
                         else:
                             print(f"🔧 DEBUG: new_memory is None/empty!")
                     except Exception as e:
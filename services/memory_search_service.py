@@ -1,6 +1,7 @@
 #!/usr/bin/env python3
 
 import requests
+from contextlib import nullcontext
 from config import config
 
 class MemorySearchService:
@@ -122,40 +123,43 @@ class MemorySearchService:
             # Use provided threshold or default
             threshold = threshold if threshold is not None else self.min_relevance
             
-            # Use the comprehensive function to get connections and similarity matrix
-            result = self.memory_manager._calculate_all_scores_and_connections(threshold)
-            if result is None or result == (None, None):
-                return {'nodes': [], 'edges': []}
+            # Connections and node list under the manager lock (if it has one), so a
+            # concurrent add/delete cannot shift rows between the two reads
+            with getattr(self.memory_manager, '_lock', nullcontext()):
+                # Use the comprehensive function to get connections and similarity matrix
+                result = self.memory_manager._calculate_all_scores_and_connections(threshold)
+                if result is None or result == (None, None):
+                    return {'nodes': [], 'edges': []}
             
-            connections, sim_matrix = result
-            all_mems = self.memory_manager._get_all_memories_flat()
-            nodes = []
-            edges = []
+                connections, sim_matrix = result
+                all_mems = self.memory_manager._get_all_memories_flat()
+                nodes = []
+                edges = []
 
-            # Build nodes
-            for mem in all_mems:
-                nodes.append({
-                    'id': mem['id'],
-                    'label': mem['content'],
-                    'score': mem.get('score', 0),
-                    'created': mem.get('created', ''),
-                    'tags': mem.get('tags', []),
-                    'size': 20 + min(mem.get('score', 0), 100) * 0.5,
-                })
+                # Build nodes
+                for mem in all_mems:
+                    nodes.append({
+                        'id': mem['id'],
+                        'label': mem['content'],
+                        'score': mem.get('score', 0),
+                        'created': mem.get('created', ''),
+                        'tags': mem.get('tags', []),
+                        'size': 20 + min(mem.get('score', 0), 100) * 0.5,
+                    })
 
-            # Build edges from the connection graph
-            n = len(all_mems)
-            for i in range(n):
-                for j, sim in connections[i]:
-                    if i < j:  # Avoid duplicate edges
-                        edges.append({
-                            'from': all_mems[i]['id'],
-                            'to': all_mems[j]['id'],
-                            'value': sim,
-                            'color': 'rgba(168,85,247,' + str(min(1, sim)) + ')',
-                            'width': 2 + 12 * sim,
-                            'type': 'semantic'
-                        })
+                # Build edges from the connection graph
+                n = len(all_mems)
+                for i in range(n):
+                    for j, sim in connections[i]:
+                        if i < j:  # Avoid duplicate edges
+                            edges.append({
+                                'from': all_mems[i]['id'],
+                                'to': all_mems[j]['id'],
+                                'value': sim,
+                                'color': 'rgba(168,85,247,' + str(min(1, sim)) + ')',
+                                'width': 2 + 12 * sim,
+                                'type': 'semantic'
+                            })
 
             return {'nodes': nodes, 'edges': edges}
             
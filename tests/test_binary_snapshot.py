@@ -0,0 +1,132 @@
+import sys
+import os
+import glob
+import shutil
+import tempfile
+
+# Add the memory-app backend to the path
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'memory-app', 'backend'))
+
+# Import MemoryManager
+from memory_manager import MemoryManager
+from test_write_ahead_log import create_memory_file, mutate, compare_managers, close_managers
+
+def open_manager(db_path, managers, binary_snapshot=True):
+    memory_manager = MemoryManager(db_path=db_path, storage_backend="json", binary_snapshot=binary_snapshot,
+                                   flush_interval_ms=0, reinforcement_mode="sync")
+    managers.append(memory_manager)
+    return memory_manager
+
+def loaded_from_snapshot(memory_manager):
+    # A snapshot start never touches the embedding cache
+    stats = memory_manager.get_cache_stats()["embedding_cache"]
+    return stats["hits"] + stats["misses"] == 0
+
+def check_start(expected, db_path, want_snapshot):
+    managers = []
+    try:
+        memory_manager = open_manager(db_path, managers)
+        from_snapshot = loaded_from_snapshot(memory_manager)
+        print(f"   🚀 Started from {'binary snapshot' if from_snapshot else 'memories.json (rebuilt index)'}")
+        if from_snapshot != want_snapshot:
+            print(f"   ❌ Expected a {'snapshot' if want_snapshot else 'fallback'} start")
+            return False
+        return compare_managers(expected, memory_manager)
+    finally:
+        close_managers(managers)
+
+def test_snapshot_round_trip():
+    print("🧪 Testing Binary Snapshot Save/Load\n")
+
+    temp_dir = tempfile.mkdtemp()
+    managers = []
+    try:
+        db_path = create_memory_file(temp_dir)
+        memory_manager = open_manager(db_path, managers)
+        mutate(memory_manager)
+        memory_manager.close()  # Refreshes the snapshot
+
+        return check_start(memory_manager, db_path, want_snapshot=True)
+    finally:
+        close_managers(managers)
+        shutil.rmtree(temp_dir)
+
+def test_snapshot_fallback():
+    print("\n🧪 Testing Binary Snapshot Fallback\n")
+
+    temp_dir = tempfile.mkdtemp()
+    managers = []
+    try:
+        db_path = create_memory_file(temp_dir)
+        memory_manager = open_manager(db_path, managers)
+        mutate(memory_manager)
+        memory_manager.close()
+        prefix = os.path.splitext(db_path)[0] + ".snapshot"
+        results = []
+
+        print("   📁 Snapshot data file truncated:")
+        content_file = glob.glob(prefix + ".*.bin")[0]
+        with open(content_file, "r+b") as f:
+            f.truncate(os.path.getsize(content_file) // 2)
+        results.append(check_start(memory_manager, db_path, want_snapshot=False))
+
+        print("   📁 Snapshot files missing:")
+        for path in glob.glob(prefix + ".*"):
+            os.remove(path)
+        results.append(check_start(memory_manager, db_path, want_snapshot=False))
+
+        print("   📁 memories.json changed after the snapshot was written:")
+        memory_manager = open_manager(db_path, managers)
+        memory_manager.close()
+        writer = open_manager(db_path, managers, binary_snapshot=False)
+        writer.add_memory("I moved to a new city last year")
+        writer.flush()
+        results.append(check_start(writer, db_path, want_snapshot=False))
+
+        return all(results)
+    finally:
+        close_managers(managers)
+        shutil.rmtree(temp_dir)
+
+def test_snapshot_storage_removed():
+    print("\n🧪 Testing Binary Snapshot After Storage Files Are Removed\n")
+
+    temp_dir = tempfile.mkdtemp()
+    managers = []
+    try:
+        db_path = create_memory_file(temp_dir)
+        memory_manager = open_manager(db_path, managers)
+        memory_manager.close()
+
+        # Remove memories.json and its log while a manager still holds the memories
+        memory_manager = open_manager(db_path, managers)
+        for path in (db_path, db_path + ".wal"):
+            if os.path.exists(path):
+                os.remove(path)
+        memory_manager.close()
+        if glob.glob(os.path.splitext(db_path)[0] + ".snapshot.*"):
+            print("   ❌ A snapshot was left behind for storage that no longer exists")
+            return False
+
+        restarted = open_manager(db_path, managers)
+        remaining = restarted.get_all_memories()["memories"]
+        if remaining:
+            print(f"   ❌ {len(remaining)} removed memories came back from the snapshot")
+            return False
+        print("   ✅ No snapshot written, no memories after restart")
+        return True
+    finally:
+        close_managers(managers)
+        shutil.rmtree(temp_dir)
+
+if __name__ == "__main__":
+    print("🧠 Binary Snapshot Test Suite")
+    print("=" * 60)
+
+    round_trip_ok = test_snapshot_round_trip()
+    fallback_ok = test_snapshot_fallback()
+    removed_ok = test_snapshot_storage_removed()
+
+    print("\n🏁 Binary snapshot testing completed!")
+    print(f"Save/load: {'✅' if round_trip_ok else '❌'}  Fallback: {'✅' if fallback_ok else '❌'}  "
+          f"Storage removed: {'✅' if removed_ok else '❌'}")
@@ -1,6 +1,9 @@
 import sys
 import os
 import time
+import json
+import shutil
+import tempfile
 
 # Add the memory-app backend to the path
 sys.path.append(os.path.join(os.path.dirname(__file__), 'memory-app', 'backend'))
@@ -31,6 +34,7 @@ def test_memory_reinforcement():
         
         # Search memories (this will trigger reinforcement)
         search_results = memory_manager.search_memories(test_query, top_k=3, min_relevance=0.2)
+        memory_manager.flush_reinforcements()  # Reinforcement is applied in the background
         
         if search_results:
             print(f"   Found {len(search_results)} memories:")
@@ -93,17 +97,57 @@ def test_different_queries():
         for query in queries:
             print(f"   🔍 '{query}'")
             results = memory_manager.search_memories(query, top_k=2, min_relevance=0.2)
+            memory_manager.flush_reinforcements()
             for result in results:
                 print(f"      → '{result['memory']['content']}' (score: {result['memory']['score']:.2f})")
         
         print()
 
+def test_background_matches_sync():
+    print("\n⏱️ Testing Background Reinforcement Against Sync Reinforcement\n")
+    
+    contents = [
+        "I love pizza and italian food",
+        "I am a genius with a high IQ",
+        "Pizza is my favorite food",
+        "I like pasta and italian cuisine a lot",
+        "I am a very smart person",
+    ]
+    queries = ["pizza food", "Am I smart?", "italian", "pizza", "What's my IQ?"]
+    
+    final_scores = {}
+    for mode in ("sync", "background"):
+        temp_dir = tempfile.mkdtemp()
+        db_path = os.path.join(temp_dir, "memories.json")
+        with open(db_path, "w") as f:
+            json.dump({"memories": [
+                {"id": f"mem_{i}", "content": content, "score": 1, "tags": [], "created": "2024-01-01"}
+                for i, content in enumerate(contents)
+            ]}, f)
+        
+        memory_manager = MemoryManager(db_path=db_path, reinforcement_mode=mode)
+        for query in queries:
+            memory_manager.search_memories(query, top_k=2, min_relevance=0.1)
+        # Background mode applies every queued search here, one pass per search
+        memory_manager.flush_reinforcements()
+        final_scores[mode] = [mem['score'] for mem in memory_manager.get_all_memories()['memories']]
+        memory_manager.close()
+        shutil.rmtree(temp_dir)
+        print(f"   {mode}: {final_scores[mode]}")
+    
+    if final_scores["sync"] == final_scores["background"]:
+        print("✅ Background reinforcement gives the same scores as sync reinforcement")
+    else:
+        print("❌ Background reinforcement scores differ from sync reinforcement")
+    return final_scores["sync"] == final_scores["background"]
+
 if __name__ == "__main__":
     print("🧠 Dynamic Memory Reinforcement Test Suite")
     print("=" * 60)
     
     test_memory_reinforcement()
     test_different_queries()
+    test_background_matches_sync()
     
     print("\n🏁 Reinforcement testing completed!")
     print("💡 The system now learns which memories are most important based on usage!") 
\ No newline at end of file
@@ -0,0 +1,93 @@
+import sys
+import os
+import shutil
+import tempfile
+
+# Add the memory-app backend to the path
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'memory-app', 'backend'))
+
+# Import MemoryManager
+from memory_manager import MemoryManager
+from test_write_ahead_log import create_memory_file, mutate, compare_managers, close_managers
+
+def open_manager(db_path, storage_backend, managers):
+    memory_manager = MemoryManager(db_path=db_path, storage_backend=storage_backend, binary_snapshot=False,
+                                   flush_interval_ms=0, reinforcement_mode="sync")
+    managers.append(memory_manager)
+    return memory_manager
+
+def test_json_to_sqlite_migration():
+    print("🧪 Testing JSON to SQLite Migration\n")
+
+    temp_dir = tempfile.mkdtemp()
+    managers = []
+    try:
+        db_path = create_memory_file(temp_dir)
+        # Leave mutations in the write-ahead log: the migration has to replay them too
+        json_manager = open_manager(db_path, "json", managers)
+        mutate(json_manager)
+
+        sqlite_manager = open_manager(db_path, "sqlite", managers)
+        print(f"   🗄️ Migrated {sqlite_manager.store.count()} memories into {os.path.basename(sqlite_manager.store.db_path)}")
+        return compare_managers(json_manager, sqlite_manager)
+    finally:
+        close_managers(managers)
+        shutil.rmtree(temp_dir)
+
+def test_sqlite_round_trip():
+    print("\n🧪 Testing SQLite Round Trip\n")
+
+    temp_dir = tempfile.mkdtemp()
+    managers = []
+    try:
+        db_path = create_memory_file(temp_dir)
+        sqlite_manager = open_manager(db_path, "sqlite", managers)
+        json_before = open(db_path).read()
+        mutate(sqlite_manager)
+        sqlite_manager.close()
+
+        # Reopening must read memories.db, not migrate memories.json a second time
+        reopened = open_manager(db_path, "sqlite", managers)
+        if open(db_path).read() != json_before:
+            print("   ❌ memories.json was modified by the SQLite backend")
+            return False
+        return compare_managers(sqlite_manager, reopened)
+    finally:
+        close_managers(managers)
+        shutil.rmtree(temp_dir)
+
+def test_sqlite_delete_all_restart():
+    print("\n🧪 Testing SQLite Restart After Deleting Every Memory\n")
+
+    temp_dir = tempfile.mkdtemp()
+    managers = []
+    try:
+        db_path = create_memory_file(temp_dir)
+        sqlite_manager = open_manager(db_path, "sqlite", managers)
+        for mem in list(sqlite_manager.get_all_memories()["memories"]):
+            sqlite_manager.delete_memory(mem["id"])
+        sqlite_manager.close()
+
+        # memories.json is only imported once; an emptied database stays empty
+        reopened = open_manager(db_path, "sqlite", managers)
+        remaining = reopened.get_all_memories()["memories"]
+        if remaining:
+            print(f"   ❌ {len(remaining)} deleted memories came back from memories.json")
+            return False
+        print("   ✅ No memories after restart")
+        return True
+    finally:
+        close_managers(managers)
+        shutil.rmtree(temp_dir)
+
+if __name__ == "__main__":
+    print("🧠 SQLite Storage Test Suite")
+    print("=" * 60)
+
+    migration_ok = test_json_to_sqlite_migration()
+    round_trip_ok = test_sqlite_round_trip()
+    delete_all_ok = test_sqlite_delete_all_restart()
+
+    print("\n🏁 SQLite storage testing completed!")
+    print(f"Migration: {'✅' if migration_ok else '❌'}  Round trip: {'✅' if round_trip_ok else '❌'}  "
+          f"Delete all: {'✅' if delete_all_ok else '❌'}")
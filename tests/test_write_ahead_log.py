@@ -0,0 +1,140 @@
+import sys
+import os
+import json
+import shutil
+import tempfile
+import numpy as np
+
+# Add the memory-app backend to the path
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'memory-app', 'backend'))
+
+# Import MemoryManager
+from memory_manager import MemoryManager
+from write_ahead_log import load_json_with_wal
+
+SEED_MEMORIES = [
+    "I love pizza and italian food",
+    "I am a genius with a high IQ",
+    "My dog is named Rex and he is brown",
+    "I like pasta and italian cuisine a lot",
+]
+
+def create_memory_file(temp_dir):
+    db_path = os.path.join(temp_dir, "memories.json")
+    with open(db_path, "w") as f:
+        json.dump({"memories": [
+            {"id": f"mem_{i}", "content": content, "score": 1, "tags": [], "created": "2024-01-01"}
+            for i, content in enumerate(SEED_MEMORIES)
+        ]}, f)
+    return db_path
+
+def open_manager(db_path, managers):
+    # Write-through and no binary snapshot, so every start replays memories.json + WAL
+    memory_manager = MemoryManager(db_path=db_path, storage_backend="json", binary_snapshot=False,
+                                   flush_interval_ms=0, reinforcement_mode="sync")
+    managers.append(memory_manager)
+    return memory_manager
+
+def close_managers(managers):
+    # Close before the temp dir is removed, or the atexit close writes into it again
+    for memory_manager in managers:
+        memory_manager.close()
+
+def mutate(memory_manager):
+    """Add, delete, boost and reinforce, so the log holds every record type."""
+    added = memory_manager.add_memory("I play guitar in a band on weekends", tags=["music"])
+    memory_manager.add_memory("Pizza is my favorite food")
+    memory_manager.delete_memory("mem_2")
+    memory_manager.boost_memory(added["id"], boost_factor=1.5)
+    memory_manager.search_memories("italian pizza", top_k=2, min_relevance=0.1)
+    memory_manager.flush()
+
+def compare_managers(expected, actual):
+    """Check that two managers hold the same memories, scores and embeddings."""
+    expected_memories = expected.get_all_memories()["memories"]
+    actual_memories = actual.get_all_memories()["memories"]
+    ok = True
+    if expected_memories != actual_memories:
+        print("   ❌ Memories differ")
+        for mem in expected_memories:
+            print(f"      expected '{mem['content'][:30]}...' (score: {mem['score']})")
+        for mem in actual_memories:
+            print(f"      actual   '{mem['content'][:30]}...' (score: {mem['score']})")
+        ok = False
+    if [m["id"] for m in expected.search_index_map] != [m["id"] for m in actual.search_index_map]:
+        print("   ❌ Search index rows are in a different order")
+        ok = False
+    elif not np.allclose(expected.search_embeddings, actual.search_embeddings, atol=1e-6):
+        print("   ❌ Embeddings differ")
+        ok = False
+    if ok:
+        print(f"   ✅ {len(actual_memories)} memories, their scores and embeddings match")
+    return ok
+
+def test_wal_replay():
+    print("🧪 Testing Write-Ahead Log Replay\n")
+
+    temp_dir = tempfile.mkdtemp()
+    managers = []
+    try:
+        db_path = create_memory_file(temp_dir)
+        memory_manager = open_manager(db_path, managers)
+        snapshot_before = open(db_path).read()
+        mutate(memory_manager)
+
+        # Mutations only go to the log; memories.json is left alone until compaction
+        records = open(db_path + ".wal").read().splitlines()[1:]
+        print(f"   📝 {len(records)} write-ahead log records: {sorted({json.loads(r)['op'] for r in records})}")
+        if open(db_path).read() != snapshot_before:
+            print("   ❌ memories.json was rewritten for a single mutation")
+            return False
+
+        # Tools that read memories.json directly (cloud migration) must see the logged mutations too
+        by_id = lambda mems: {m["id"]: m for m in mems}
+        if by_id(load_json_with_wal(db_path)["memories"]) != by_id(memory_manager.get_all_memories()["memories"]):
+            print("   ❌ load_json_with_wal() does not match the manager's memories")
+            return False
+
+        # Simulate a crash: start a second manager without closing the first one
+        recovered = open_manager(db_path, managers)
+        return compare_managers(memory_manager, recovered)
+    finally:
+        close_managers(managers)
+        shutil.rmtree(temp_dir)
+
+def test_wal_compaction():
+    print("\n🧪 Testing Write-Ahead Log Compaction\n")
+
+    temp_dir = tempfile.mkdtemp()
+    managers = []
+    os.environ["MEMORY_WAL_COMPACT_RECORDS"] = "3"
+    try:
+        db_path = create_memory_file(temp_dir)
+        memory_manager = open_manager(db_path, managers)
+        mutate(memory_manager)
+
+        # The log was folded into memories.json once it reached 3 records
+        with open(db_path) as f:
+            snapshot = json.load(f)
+        records = open(db_path + ".wal").read().splitlines()[1:]
+        print(f"   📦 memories.json holds {len(snapshot['memories'])} memories, {len(records)} records left in the log")
+        if "wal_generation" not in snapshot or len(records) >= 3:
+            print("   ❌ The write-ahead log was not compacted")
+            return False
+
+        recovered = open_manager(db_path, managers)
+        return compare_managers(memory_manager, recovered)
+    finally:
+        del os.environ["MEMORY_WAL_COMPACT_RECORDS"]
+        close_managers(managers)
+        shutil.rmtree(temp_dir)
+
+if __name__ == "__main__":
+    print("🧠 Write-Ahead Log Test Suite")
+    print("=" * 60)
+
+    replay_ok = test_wal_replay()
+    compaction_ok = test_wal_compaction()
+
+    print("\n🏁 Write-ahead log testing completed!")
+    print(f"Replay: {'✅' if replay_ok else '❌'}  Compaction: {'✅' if compaction_ok else '❌'}")
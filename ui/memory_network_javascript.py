@@ -25,11 +25,12 @@ MEMORY_NETWORK_JAVASCRIPT = '''
     // Session memory store for real-time updates
     let sessionMemories = [];
     let sessionMemoryIds = new Set();
-    let newMemoryPollingInterval = null;
+    let newMemoryEventSource = null;
     
     // Live score update system
     let scoreUpdateInterval = null;
-    let lastScoreUpdateTime = 0;
+    let lastScoreGeneration = null; // server score generation of the last update we applied
+    let lastScoreEpoch = null; // server epoch that generation belongs to
     let scoreUpdateEnabled = false;
     let nodeScoreAnimations = new Map(); // Track ongoing score animations
 
@@ -135,13 +136,17 @@ MEMORY_NETWORK_JAVASCRIPT = '''
 
     async function checkForScoreUpdates() {
         try {
-            const response = await fetch('/score-updates');
+            // Ask only for scores that changed since the last generation we saw
+            const url = lastScoreGeneration === null
+                ? '/score-updates'
+                : `/score-updates?since=${lastScoreGeneration}&epoch=${encodeURIComponent(lastScoreEpoch)}`;
+            const response = await fetch(url);
             const data = await response.json();
             
             if (data.success && data.updates) {
-                // Check if we have new updates
-                if (data.timestamp > lastScoreUpdateTime) {
-                    lastScoreUpdateTime = data.timestamp;
+                lastScoreGeneration = data.generation ?? null;
+                lastScoreEpoch = data.epoch ?? null;
+                if (data.updates.length > 0) {
                     await updateNodeScores(data.updates);
                 }
             }
@@ -158,10 +163,11 @@ MEMORY_NETWORK_JAVASCRIPT = '''
         // Extract all current scores for proportional sizing
         const allScores = networkData.nodes.map(n => n.score || 0);
         let hasChanges = false;
+        const nodesById = new Map(networkData.nodes.map(n => [n.id, n]));
 
         // Update scores and trigger animations
         scoreUpdates.forEach(update => {
-            const node = networkData.nodes.find(n => n.id === update.id);
+            const node = nodesById.get(update.id);
             if (node) {
                 const oldScore = node.score || 0;
                 const newScore = update.score;
@@ -787,15 +793,6 @@ MEMORY_NETWORK_JAVASCRIPT = '''
         }
     }
 
-    // Toggle new memory polling
-    function toggleNewMemoryPolling() {
-        if (newMemoryPollingInterval) {
-            stopNewMemoryPolling();
-        } else {
-            startNewMemoryPolling();
-        }
-    }
-
     // Session-based memory management for real-time updates
     function addMemoryToSession(memoryData) {
         console.log('🔧 DEBUG: addMemoryToSession called with:', memoryData);
@@ -1023,60 +1020,57 @@ MEMORY_NETWORK_JAVASCRIPT = '''
         }, 3000);
     };
 
-    // Polling system for new memories
-    function startNewMemoryPolling() {
-        console.log('🔧 DEBUG: startNewMemoryPolling called');
-        
-        if (newMemoryPollingInterval) {
-            console.log('🔧 DEBUG: Clearing existing polling interval');
-            clearInterval(newMemoryPollingInterval);
+    // New memories pushed by the server (MemoryEventLog in memory-app/backend/memory_events.py)
+    function startNewMemoryStream() {
+        if (newMemoryEventSource) {
+            newMemoryEventSource.close();
         }
         
-        newMemoryPollingInterval = setInterval(checkForNewMemories, 2000); // Poll every 2 seconds
-        console.log('📡 Started polling for new memories every 2 seconds');
-        console.log('🔧 DEBUG: Polling interval ID:', newMemoryPollingInterval);
-    }
-
-    function stopNewMemoryPolling() {
-        if (newMemoryPollingInterval) {
-            clearInterval(newMemoryPollingInterval);
-            newMemoryPollingInterval = null;
-            console.log('⏸️ Stopped polling for new memories');
-        }
+        newMemoryEventSource = new EventSource('/memory-events');
+        newMemoryEventSource.addEventListener('memory', (event) => {
+            const memoryData = JSON.parse(event.data);
+            console.log('🔔 New memory event:', memoryData.id);
+            if (!replaceTempNode(memoryData)) {
+                addMemoryToSession(memoryData);
+            }
+        });
+        // Sent when this client missed events (e.g. after a server restart)
+        newMemoryEventSource.addEventListener('resync', () => {
+            console.log('🔄 Missed memory events, reloading network');
+            loadMemoryNetwork();
+        });
+        newMemoryEventSource.onerror = () => {
+            console.warn('⚠️ Memory event stream interrupted, reconnecting...');
+        };
+        console.log('📡 Subscribed to new memory events');
     }
 
-    async function checkForNewMemories() {
-        try {
-            console.log('🔧 DEBUG: ========== POLLING /new-memories ENDPOINT ==========');
-            console.log('🔧 DEBUG: Making GET request to /new-memories (NOT /end_thread)');
-            
-            const response = await fetch('/new-memories');
-            console.log('🔧 DEBUG: /new-memories response status:', response.status);
-            console.log('🔧 DEBUG: /new-memories response headers:', [...response.headers.entries()]);
-            
-            const data = await response.json();
-            console.log('🔧 DEBUG: /new-memories response data:', JSON.stringify(data, null, 2));
-            console.log('🔧 DEBUG: Expected format: { "memories": [...], "count": N }');
-            
-            if (data.memories && data.memories.length > 0) {
-                console.log(`🔔 ✅ Found ${data.memories.length} new memories in session queue!`);
-                console.log('🔧 DEBUG: Memory details:', data.memories.map(m => ({ id: m.id, content: m.content.substring(0, 50) + '...' })));
-                
-                // Add each new memory to the network
-                data.memories.forEach((memoryData, index) => {
-                    console.log(`🔧 DEBUG: Processing session memory ${index + 1}:`, memoryData);
-                    addMemoryToSession(memoryData);
-                });
-            } else {
-                console.log('🔧 DEBUG: ⚠️ No new memories found in session queue');
-                console.log('🔧 DEBUG: data.memories:', data.memories);
-                console.log('🔧 DEBUG: data.count:', data.count);
-            }
-            
-            console.log('🔧 DEBUG: ========== /new-memories POLLING COMPLETE ==========');
-        } catch (error) {
-            console.error('🔧 DEBUG: ❌ Error polling /new-memories endpoint:', error);
+    // The chat adds a temporary node as soon as a memory is extracted; when the
+    // stored memory arrives, give that node the real id instead of adding it twice
+    function replaceTempNode(memoryData) {
+        const tempNode = networkData.nodes.find(node =>
+            String(node.id).startsWith('temp_') && node.content === memoryData.content);
+        if (!tempNode) {
+            return false;
         }
+        
+        const tempId = tempNode.id;
+        tempNode.id = memoryData.id;
+        tempNode.score = memoryData.score;
+        tempNode.tags = memoryData.tags || [];
+        tempNode.created = memoryData.created || tempNode.created;
+        networkData.edges.forEach(edge => {
+            if (edge.from === tempId) edge.from = memoryData.id;
+            if (edge.to === tempId) edge.to = memoryData.id;
+        });
+        nodeGlowLevels[memoryData.id] = nodeGlowLevels[tempId] || 0;
+        delete nodeGlowLevels[tempId];
+        
+        sessionMemories.push(memoryData);
+        sessionMemoryIds.add(memoryData.id);
+        memoryNetwork.setData(networkData);
+        console.log(`🔁 Replaced temporary node ${tempId} with memory ${memoryData.id}`);
+        return true;
     }
 
     function animateMemoryActivation(activatedMemoryIds) {
@@ -1637,13 +1631,14 @@ MEMORY_NETWORK_JAVASCRIPT = '''
         initializeMemoryNetwork();
         loadMemoryNetwork();
         
-        // Note: Real-time memory updates now use immediate temporary nodes instead of polling
-        // startNewMemoryPolling(); // Disabled - using immediate temp nodes instead
+        // New memories arrive over the event stream; the chat's temporary nodes
+        // are swapped for the stored memories as their events come in
+        startNewMemoryStream();
         
         // Initialize live score updates (disabled by default)
         console.log('🎉 Memory Network initialized! Auto-refresh disabled by default for persistent node positions.');
         console.log('💡 Use the refresh button or enable auto-refresh if needed.');
-        console.log('🚀 Real-time memory updates enabled via immediate temporary nodes!');
+        console.log('🚀 Real-time memory updates enabled via the memory event stream!');
         console.log('📊 Live score updates available - click "Enable Live Scores" to activate!');
     }, 1000);
     </script>
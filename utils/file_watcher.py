@@ -1,85 +1,67 @@
 #!/usr/bin/env python3
 
 import os
-import time
 import threading
-import hashlib
 from watchdog.observers import Observer
 from watchdog.events import FileSystemEventHandler
 
-def start_memory_file_watcher(memory_manager, path):
+def start_memory_file_watcher(memory_manager):
     """Start watching memory files for changes and reload when needed"""
+    # The storage files all live next to the manager's JSON file (db_path for
+    # MemoryManager, memory_file for LightweightMemoryManager)
+    json_path = os.path.abspath(getattr(memory_manager, 'db_path', None) or memory_manager.memory_file)
+    watch_dir = os.path.dirname(json_path)
+    json_name = os.path.basename(json_path)
+    db_name = os.path.splitext(json_name)[0] + '.db'
     
     class MemoryFileHandler(FileSystemEventHandler):
-        def __init__(self):
+        # memories.json is replaced by a rename, its log and SQLite files are modified in place
+        WATCHED_FILES = (json_name, json_name + '.wal', db_name, db_name + '-wal')
+        
+        def __init__(self, debounce=0.3):
             super().__init__()
-            self.last_reload_time = 0
-            self.last_file_size = 0
-            self.last_file_hash = None
+            self.debounce = debounce
+            self._timer = None
+            self._lock = threading.Lock()
+            
+        def _is_memory_file(self, file_path):
+            return os.path.basename(file_path) in self.WATCHED_FILES
             
         def on_modified(self, event):
-            # Only process memories.json files
-            if not event.src_path.endswith('memories.json'):
-                return
-                
-            # Skip temporary, backup, and lock files
-            if event.src_path.endswith(('.tmp', '.backup', '.lock')):
-                return
+            if self._is_memory_file(event.src_path):
+                self._schedule_reload()
                 
-            current_time = time.time()
-            
-            # Avoid duplicate reloads within 10 seconds to reduce position resets
-            if current_time - self.last_reload_time < 10.0:
-                return
-            
-            try:
-                # Check if file actually changed (avoid reloading on same content)
-                if os.path.exists(event.src_path):
-                    current_size = os.path.getsize(event.src_path)
-                    
-                    # Skip if file is empty or being written
-                    if current_size == 0:
-                        return
-                    
-                    # Wait a bit for file write to complete
-                    time.sleep(0.2)
-                    
-                    # Calculate file hash to detect actual content changes
-                    try:
-                        with open(event.src_path, 'rb') as f:
-                            file_hash = hashlib.md5(f.read()).hexdigest()
-                        
-                        # Skip if content hasn't actually changed
-                        if file_hash == self.last_file_hash:
-                            return
-                            
-                        self.last_file_hash = file_hash
-                        self.last_file_size = current_size
-                    except (IOError, OSError):
-                        # File might be locked, skip this reload
-                        print(f"[Watcher] 📁 File locked, skipping reload")
-                        return
+        def on_moved(self, event):
+            if self._is_memory_file(event.dest_path):
+                self._schedule_reload()
                 
-                print(f"[Watcher] 📁 Detected memories.json change, reloading...")
+        def _schedule_reload(self):
+            # Coalesce a burst of file events into one reload once writes settle
+            with self._lock:
+                if self._timer is not None:
+                    self._timer.cancel()
+                self._timer = threading.Timer(self.debounce, self._reload)
+                self._timer.daemon = True
+                self._timer.start()
                 
-                # Add delay before reloading to let file operations complete
-                time.sleep(0.5)
+        def _reload(self):
+            try:
+                # reload_from_disk returns immediately if nothing changed (e.g. our own
+                # writes) and otherwise only applies the difference to the search index
                 memory_manager.reload_from_disk()
-                self.last_reload_time = current_time
-                
             except Exception as e:
                 print(f"[Watcher] ❌ Error during reload: {e}")
                     
     observer = Observer()
     handler = MemoryFileHandler()
-    observer.schedule(handler, path=os.path.dirname(path), recursive=False)
+    observer.schedule(handler, path=watch_dir, recursive=False)
     observer.daemon = True
     observer.start()
-    print(f"[Watcher] 👀 Watching {path} for changes...")
+    print(f"[Watcher] 👀 Watching {watch_dir} for changes...")
     
     return observer
 
-def setup_file_watcher(memory_manager, memory_json_path):
+def setup_file_watcher(memory_manager):
     """Setup file watcher if memory manager is available"""
     if not memory_manager:
         print("⚠️ Memory manager not available, skipping file watcher")
@@ -88,7 +70,7 @@ def setup_file_watcher(memory_manager, memory_json_path):
     try:
         watcher_thread = threading.Thread(
             target=start_memory_file_watcher, 
-            args=(memory_manager, memory_json_path), 
+            args=(memory_manager,), 
             daemon=True
         )
         watcher_thread.start()